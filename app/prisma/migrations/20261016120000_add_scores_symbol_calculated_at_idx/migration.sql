@@ -0,0 +1,2 @@
+-- CreateIndex
+CREATE INDEX "scores_symbol_calculated_at_idx" ON "public"."scores"("symbol", "calculated_at" DESC);
@@ -0,0 +1,132 @@
+-- CreateTable
+CREATE TABLE "public"."security_latest_score" (
+    "symbol" VARCHAR(10) NOT NULL,
+    "score_id" INTEGER NOT NULL,
+    "score_value" DECIMAL(5,2) NOT NULL,
+    "calculated_at" TIMESTAMP(3) NOT NULL,
+    "factor_breakdown_json" JSONB,
+    "score_grade" VARCHAR(2) NOT NULL,
+    "recommendation" VARCHAR(50) NOT NULL,
+
+    CONSTRAINT "security_latest_score_pkey" PRIMARY KEY ("symbol")
+);
+
+-- CreateIndex
+CREATE INDEX "security_latest_score_score_value_symbol_idx" ON "public"."security_latest_score"("score_value", "symbol");
+
+-- AddForeignKey
+ALTER TABLE "public"."security_latest_score" ADD CONSTRAINT "security_latest_score_symbol_fkey" FOREIGN KEY ("symbol") REFERENCES "public"."securities"("symbol") ON DELETE CASCADE ON UPDATE CASCADE;
+
+-- Derived fields, mirroring Score.score_grade and Score.recommendation in the backend
+CREATE OR REPLACE FUNCTION "public"."score_grade"(value DECIMAL) RETURNS VARCHAR AS $$
+    SELECT CASE
+        WHEN value >= 90 THEN 'A+'
+        WHEN value >= 85 THEN 'A'
+        WHEN value >= 80 THEN 'A-'
+        WHEN value >= 75 THEN 'B+'
+        WHEN value >= 70 THEN 'B'
+        WHEN value >= 65 THEN 'B-'
+        WHEN value >= 60 THEN 'C'
+        ELSE 'D'
+    END
+$$ LANGUAGE SQL IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION "public"."score_recommendation"(value DECIMAL, breakdown JSONB) RETURNS VARCHAR AS $$
+    SELECT COALESCE(
+        CASE WHEN jsonb_typeof(breakdown) = 'object' THEN breakdown -> 'explanation' ->> 'recommendation' END,
+        CASE
+            WHEN value >= 80 THEN 'Strong Buy'
+            WHEN value >= 70 THEN 'Buy'
+            WHEN value >= 60 THEN 'Hold'
+            ELSE 'Sell'
+        END
+    )
+$$ LANGUAGE SQL IMMUTABLE;
+
+-- Inserts only ever move a symbol's latest score forward: upsert the newest inserted row per symbol
+CREATE OR REPLACE FUNCTION "public"."security_latest_score_on_insert"() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO "public"."security_latest_score" AS latest
+        ("symbol", "score_id", "score_value", "calculated_at", "factor_breakdown_json", "score_grade", "recommendation")
+    SELECT DISTINCT ON (s."symbol")
+        s."symbol", s."id", s."score_value", s."calculated_at", s."factor_breakdown_json",
+        "public"."score_grade"(s."score_value"),
+        "public"."score_recommendation"(s."score_value", s."factor_breakdown_json")
+    FROM new_scores s
+    ORDER BY s."symbol", s."calculated_at" DESC, s."id" DESC
+    ON CONFLICT ("symbol") DO UPDATE SET
+        "score_id" = EXCLUDED."score_id",
+        "score_value" = EXCLUDED."score_value",
+        "calculated_at" = EXCLUDED."calculated_at",
+        "factor_breakdown_json" = EXCLUDED."factor_breakdown_json",
+        "score_grade" = EXCLUDED."score_grade",
+        "recommendation" = EXCLUDED."recommendation"
+    WHERE (EXCLUDED."calculated_at", EXCLUDED."score_id") > (latest."calculated_at", latest."score_id");
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Updates and deletes can move it backwards: recompute just the affected symbols
+CREATE OR REPLACE FUNCTION "public"."refresh_security_latest_score"(symbols VARCHAR[]) RETURNS VOID AS $$
+BEGIN
+    DELETE FROM "public"."security_latest_score" WHERE "symbol" = ANY(symbols);
+    INSERT INTO "public"."security_latest_score"
+        ("symbol", "score_id", "score_value", "calculated_at", "factor_breakdown_json", "score_grade", "recommendation")
+    SELECT
+        s."symbol", s."id", s."score_value", s."calculated_at", s."factor_breakdown_json",
+        "public"."score_grade"(s."score_value"),
+        "public"."score_recommendation"(s."score_value", s."factor_breakdown_json")
+    FROM unnest(symbols) AS affected("symbol")
+    CROSS JOIN LATERAL (
+        SELECT * FROM "public"."scores"
+        WHERE "scores"."symbol" = affected."symbol"
+        ORDER BY "calculated_at" DESC, "id" DESC
+        LIMIT 1
+    ) s;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION "public"."security_latest_score_on_update"() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM "public"."refresh_security_latest_score"(ARRAY(
+        SELECT "symbol" FROM old_scores UNION SELECT "symbol" FROM new_scores
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION "public"."security_latest_score_on_delete"() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM "public"."refresh_security_latest_score"(ARRAY(
+        SELECT DISTINCT o."symbol" FROM old_scores o
+        JOIN "public"."security_latest_score" l ON l."score_id" = o."id"
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- CreateTrigger
+CREATE TRIGGER "scores_latest_on_insert"
+    AFTER INSERT ON "public"."scores"
+    REFERENCING NEW TABLE AS new_scores
+    FOR EACH STATEMENT EXECUTE FUNCTION "public"."security_latest_score_on_insert"();
+
+CREATE TRIGGER "scores_latest_on_update"
+    AFTER UPDATE ON "public"."scores"
+    REFERENCING OLD TABLE AS old_scores NEW TABLE AS new_scores
+    FOR EACH STATEMENT EXECUTE FUNCTION "public"."security_latest_score_on_update"();
+
+CREATE TRIGGER "scores_latest_on_delete"
+    AFTER DELETE ON "public"."scores"
+    REFERENCING OLD TABLE AS old_scores
+    FOR EACH STATEMENT EXECUTE FUNCTION "public"."security_latest_score_on_delete"();
+
+-- Backfill from existing history
+INSERT INTO "public"."security_latest_score"
+    ("symbol", "score_id", "score_value", "calculated_at", "factor_breakdown_json", "score_grade", "recommendation")
+SELECT DISTINCT ON ("symbol")
+    "symbol", "id", "score_value", "calculated_at", "factor_breakdown_json",
+    "public"."score_grade"("score_value"),
+    "public"."score_recommendation"("score_value", "factor_breakdown_json")
+FROM "public"."scores"
+ORDER BY "symbol", "calculated_at" DESC, "id" DESC;
@@ -0,0 +1,8 @@
+-- CreateIndex
+CREATE INDEX "securities_sector_symbol_idx" ON "public"."securities"("sector", "symbol");
+
+-- CreateIndex
+CREATE INDEX "watchlists_user_id_idx" ON "public"."watchlists"("user_id");
+
+-- CreateIndex
+CREATE INDEX "watchlist_items_symbol_idx" ON "public"."watchlist_items"("symbol");
@@ -0,0 +1,3 @@
+-- AlterTable
+-- Recommendations come from free-form score explanations, so no width fits them all
+ALTER TABLE "public"."security_latest_score" ALTER COLUMN "recommendation" SET DATA TYPE TEXT;
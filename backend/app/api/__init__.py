@@ -6,5 +6,8 @@ API endpoint handlers
 
 from .securities import router as securities_router
 from .watchlists import router as watchlists_router
+from .stream import router as stream_router
+from .quotes import router as quotes_router
+from .scores import router as scores_router
 
-__all__ = ["securities_router", "watchlists_router"]
+__all__ = ["securities_router", "watchlists_router", "stream_router", "quotes_router", "scores_router"]
@@ -0,0 +1,50 @@
+"""
+Quotes API Routes
+Compact live quotes for arbitrary symbol sets, without loading securities
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Literal
+import logging
+
+from ..schemas import QuoteResponse
+from ..services.market_data import get_market_data_service, PRICE_FIELDS, ALL_FIELDS
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/quotes", tags=["quotes"])
+
+MAX_QUOTE_SYMBOLS = 200
+
+@router.get("", response_model=List[QuoteResponse])
+async def get_quotes(
+    symbols: str = Query(..., description="Comma-separated symbols"),
+    fields: Literal["price", "all"] = Query("price", description="Fields that must be fresh before returning"),
+    cache_only: bool = Query(False, description="Answer from the cache without waiting on providers")
+):
+    """
+    Get quotes for a set of symbols, in the order requested.
+    With cache_only, whatever is cached (possibly stale) is returned at once and
+    missing or expired symbols are refreshed in the background; symbols with
+    nothing cached yet are left out of the response.
+    """
+    requested = list(dict.fromkeys(
+        symbol.strip().upper() for symbol in symbols.split(",") if symbol.strip()
+    ))
+    if not requested:
+        raise HTTPException(status_code=400, detail="No symbols given")
+    if len(requested) > MAX_QUOTE_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_QUOTE_SYMBOLS} symbols per request")
+    
+    market_service = await get_market_data_service()
+    
+    required_fields = PRICE_FIELDS if fields == "price" else ALL_FIELDS
+    if cache_only:
+        refreshing = market_service.refresh_in_background(requested, required_fields=required_fields)
+        quotes = [market_service.cached_quote(symbol) for symbol in requested]
+        if refreshing:
+            logger.info(f"Refreshing {refreshing} of {len(requested)} quotes in background")
+        return [quote for quote in quotes if quote is not None]
+    
+    live_quotes = await market_service.get_multiple_quotes(requested, required_fields=required_fields)
+    return [live_quotes[symbol] for symbol in requested if symbol in live_quotes]
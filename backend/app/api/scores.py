@@ -0,0 +1,41 @@
+"""
+Scores API Routes
+Bulk score ingestion
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional
+import logging
+
+from ..database import get_async_db
+from ..schemas import ScoreIngestResult
+from ..services.score_ingest import (
+    ingest_scores,
+    iter_lines,
+    ScoreIngestRejected,
+    DEFAULT_BATCH_SIZE,
+    MAX_BATCH_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/scores", tags=["scores"])
+
+@router.post("/ingest", response_model=ScoreIngestResult)
+async def ingest(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Defaults from Content-Type, else ndjson"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=MAX_BATCH_SIZE),
+    strict: bool = Query(False, description="Load nothing if any record is invalid"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Stream CSV or NDJSON score records from the request body into the scores table.
+    Records are inserted in multi-row batches within a single transaction.
+    """
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    try:
+        return await ingest_scores(db, iter_lines(request.stream()), fmt, batch_size, strict)
+    except ScoreIngestRejected as e:
+        raise HTTPException(status_code=422, detail=e.result.model_dump())
@@ -3,48 +3,182 @@ Securities API Routes
 Endpoints for managing securities and scores with live market data
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, selectinload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List, Literal, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+import base64
+import json
 import logging
 
-from ..database import get_db
-from ..models import Security
-from ..schemas import SecurityWithScore
-from ..services.market_data import get_market_data_service
+from ..database import get_async_db, AsyncSessionLocal
+from ..models import Security, SecurityLatestScore
+from ..schemas import SecurityWithScore, SymbolValidityResponse, ScorePoint, ScoreHistoryResponse
+from ..services.market_data import get_market_data_service, PRICE_FIELDS
+from ..services.request_timing import timed
+from ..services.response_cache import response_cache
+from ..services.scores import (
+    with_latest_score,
+    securities_from_rows,
+    choose_bucket,
+    first_score_time,
+    naive_utc,
+    raw_history_query,
+    bucketed_history_query
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/securities", tags=["securities"], redirect_slashes=False)
 
+MAX_PAGE_SIZE = 500
+
+@dataclass
+class SecurityListParams:
+    """Query parameters for listing securities"""
+    active_only: bool = True
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omit to return every match")
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page")
+    sort: Literal["symbol", "sector", "market_cap", "score"] = "symbol"
+    order: Literal["asc", "desc"] = "asc"
+    sector: Optional[str] = None
+    min_market_cap: Optional[int] = None
+    max_market_cap: Optional[int] = None
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+    min_change: Optional[float] = Query(None, description="Minimum live price change percent")
+    max_change: Optional[float] = Query(None, description="Maximum live price change percent")
+
+def _encode_cursor(params: SecurityListParams, value, symbol: str) -> str:
+    payload = {"sort": params.sort, "order": params.order, "value": value, "symbol": symbol}
+    return base64.urlsafe_b64encode(json.dumps(payload, default=str).encode()).decode()
+
+def _decode_cursor(params: SecurityListParams) -> Tuple[object, str]:
+    """Return the (sort value, symbol) position after which the page starts"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(params.cursor.encode()))
+        matches = payload["sort"] == params.sort and payload["order"] == params.order
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not matches:
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different sort order")
+    
+    # The value is bound into the keyset comparison, so it must have the sort column's type
+    try:
+        value = payload["value"]
+        if params.sort == "score":
+            value = Decimal(str(value))
+        elif params.sort == "market_cap" and (not isinstance(value, int) or isinstance(value, bool)):
+            raise TypeError("market_cap cursor value must be an integer")
+        elif params.sort == "sector" and not isinstance(value, str):
+            raise TypeError("sector cursor value must be a string")
+        return value, str(payload["symbol"])
+    except (KeyError, ArithmeticError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _sort_key(params: SecurityListParams):
+    """Sort expression; NULLs are coalesced so the keyset comparison stays total"""
+    if params.sort == "sector":
+        return func.coalesce(Security.sector, "")
+    if params.sort == "market_cap":
+        return func.coalesce(Security.market_cap, -1)
+    if params.sort == "score":
+        return func.coalesce(SecurityLatestScore.score_value, -1)
+    return None
+
+def _sort_value(params: SecurityListParams, security: Security):
+    """Cursor value of a returned row, matching _sort_key"""
+    if params.sort == "sector":
+        return security.sector or ""
+    if params.sort == "market_cap":
+        return security.market_cap if security.market_cap is not None else -1
+    if params.sort == "score":
+        return security.latest_score.score_value if security.latest_score else -1
+    return None
+
+_securities_adapter = TypeAdapter(List[SecurityWithScore])
+_security_adapter = TypeAdapter(SecurityWithScore)
+
+def _within(value: Optional[float], low: Optional[float], high: Optional[float]) -> bool:
+    if low is None and high is None:
+        return True
+    if value is None:
+        return False
+    return (low is None or value >= low) and (high is None or value <= high)
+
 @router.get("", response_model=List[SecurityWithScore])
 async def get_securities_no_slash(
-    active_only: bool = True,
-    db: Session = Depends(get_db)
+    request: Request,
+    params: SecurityListParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return await get_securities(active_only, db)
+    return await get_securities(request, params, db)
     
 @router.get("/", response_model=List[SecurityWithScore])
 async def get_securities(
-    active_only: bool = True,
-    db: Session = Depends(get_db)
+    request: Request,
+    params: SecurityListParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get all securities with their latest scores enriched with live market data
+    Get securities with their latest scores enriched with live market data.
+    With a limit, results are paged by keyset: the X-Next-Cursor response header
+    holds the cursor for the next page and is absent on the last page.
+    Responses carry an ETag and are briefly cached for polling clients.
     """
-    # Get securities from database
-    query = db.query(Security).options(selectinload(Security.scores))
-    if active_only:
-        query = query.filter(Security.is_active == True)
-    securities = query.all()
+    cache_key = response_cache.key(request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return response_cache.respond(request, cached)
+    
+    query = with_latest_score(select(Security))
+    if params.active_only:
+        query = query.where(Security.is_active == True)
+    if params.sector:
+        query = query.where(Security.sector == params.sector)
+    if params.min_market_cap is not None:
+        query = query.where(Security.market_cap >= params.min_market_cap)
+    if params.max_market_cap is not None:
+        query = query.where(Security.market_cap <= params.max_market_cap)
+    if params.min_score is not None:
+        query = query.where(SecurityLatestScore.score_value >= params.min_score)
+    if params.max_score is not None:
+        query = query.where(SecurityLatestScore.score_value <= params.max_score)
+    
+    # Keyset pagination on (sort key, symbol); symbol breaks ties
+    sort_key = _sort_key(params)
+    descending = params.order == "desc"
+    if params.cursor:
+        value, symbol = _decode_cursor(params)
+        position = Security.symbol if sort_key is None else tuple_(sort_key, Security.symbol)
+        after = symbol if sort_key is None else tuple_(value, symbol)
+        query = query.where(position < after if descending else position > after)
+    
+    order_by = [Security.symbol] if sort_key is None else [sort_key, Security.symbol]
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in order_by])
+    if params.limit:
+        query = query.limit(params.limit + 1)
+    securities = securities_from_rows(await db.execute(query))
+    
+    headers = {}
+    if params.limit and len(securities) > params.limit:
+        securities = securities[:params.limit]
+        last = securities[-1]
+        headers["X-Next-Cursor"] = _encode_cursor(params, _sort_value(params, last), last.symbol)
     
     # Enrich with live market data
     try:
         market_service = await get_market_data_service()
         symbols = [security.symbol for security in securities]
         
-        # Fetch live data for all symbols concurrently
-        live_quotes = await market_service.get_multiple_quotes(symbols)
+        # Fetch live data for the page concurrently
+        with timed("enrich"):
+            live_quotes = await market_service.get_multiple_quotes(symbols, required_fields=PRICE_FIELDS)
         
         # Enrich securities with live data
         for security in securities:
@@ -71,26 +205,80 @@ async def get_securities(
         logger.error(f"Error enriching securities with live data: {e}")
         # Continue without live data - graceful degradation
     
-    return securities
+    # Price change is live data, so its filter applies to the page after enrichment
+    # and can leave the page short; the cursor still continues from the last row read
+    if params.min_change is not None or params.max_change is not None:
+        securities = [
+            security for security in securities
+            if _within(getattr(security, "price_change_percent", None), params.min_change, params.max_change)
+        ]
+    
+    with timed("serialize"):
+        body = _securities_adapter.dump_json(_securities_adapter.validate_python(securities, from_attributes=True))
+    entry = response_cache.store(cache_key, body, headers)
+    return response_cache.respond(request, entry)
+
+@router.get("/invalid-symbols", response_model=List[SymbolValidityResponse])
+async def get_invalid_symbols():
+    """
+    Get symbols that no market data provider currently recognises
+    """
+    market_service = await get_market_data_service()
+    return [
+        SymbolValidityResponse(
+            symbol=validity.symbol,
+            misses=validity.misses,
+            last_checked=datetime.fromtimestamp(validity.last_checked),
+            retry_at=datetime.fromtimestamp(validity.retry_at)
+        )
+        for validity in market_service.invalid_symbols()
+    ]
+
+@router.post("/invalid-symbols/deactivate")
+async def deactivate_invalid_symbols(
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Mark securities that no market data provider recognises as inactive
+    """
+    market_service = await get_market_data_service()
+    symbols = [validity.symbol for validity in market_service.invalid_symbols()]
+    if not symbols:
+        return {"deactivated": []}
+    
+    result = await db.execute(
+        update(Security)
+        .where(Security.symbol.in_(symbols), Security.is_active == True)
+        .values(is_active=False)
+        .returning(Security.symbol)
+    )
+    deactivated = sorted(result.scalars().all())
+    await db.commit()
+    response_cache.invalidate("/api/securities")
+    
+    logger.info(f"Deactivated {len(deactivated)} securities unknown to market data providers")
+    return {"deactivated": deactivated}
 
 @router.get("/{symbol}", response_model=SecurityWithScore)
 async def get_security(
     symbol: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get single security with latest score enriched with live market data
     """
-    security = db.query(Security).options(selectinload(Security.scores)).filter(
-        Security.symbol == symbol.upper()
-    ).first()
-    if not security:
+    securities = securities_from_rows(await db.execute(
+        with_latest_score(select(Security)).where(Security.symbol == symbol.upper())
+    ))
+    if not securities:
         raise HTTPException(status_code=404, detail="Security not found")
+    security = securities[0]
     
     # Enrich with live market data
     try:
         market_service = await get_market_data_service()
-        quote = await market_service.get_enriched_quote(security.symbol)
+        with timed("enrich"):
+            quote = await market_service.get_enriched_quote(security.symbol)
         
         # Add live data to security object
         security.live_price = quote.price
@@ -112,4 +300,70 @@ async def get_security(
         logger.error(f"Error enriching security {security.symbol} with live data: {e}")
         # Continue without live data - graceful degradation
     
-    return security
+    with timed("serialize"):
+        body = _security_adapter.dump_json(_security_adapter.validate_python(security, from_attributes=True))
+    return Response(content=body, media_type="application/json")
+
+async def _stream_points(query) -> AsyncIterator[str]:
+    # Own session: the stream outlives the request's dependencies
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for row in result:
+            yield ScorePoint.model_validate(row._mapping).model_dump_json() + "\n"
+
+@router.get("/{symbol}/scores", response_model=ScoreHistoryResponse)
+async def get_score_history(
+    symbol: str,
+    request: Request,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket: Optional[Literal["raw", "minute", "hour", "day", "week", "month", "year"]] = Query(
+        None, description="Bucket size; by default raw scores if they fit the point budget, else the smallest bucket that does"
+    ),
+    points: int = Query(365, ge=1, le=5000, description="Maximum points returned (the most recent ones)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get score history for a time range, downsampled into buckets with last/avg/min/max/count.
+    Send Accept: application/x-ndjson to stream one point per line instead.
+    """
+    symbol = symbol.upper()
+    # Aware and naive datetimes can't be compared, and the column holds naive UTC
+    start, end = naive_utc(start), naive_utc(end)
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if not await db.get(Security, symbol):
+        raise HTTPException(status_code=404, detail="Security not found")
+    
+    rows = None
+    if bucket is None:
+        # Raw history when it fits the budget, otherwise the finest bucket that does
+        rows = (await db.execute(raw_history_query(symbol, start, end, points + 1))).all()
+        if len(rows) <= points:
+            bucket = "raw"
+        else:
+            range_start = start or naive_utc((await db.execute(first_score_time(symbol, start, end))).scalar())
+            bucket = choose_bucket(range_start, end or datetime.utcnow(), points)
+            rows = None
+    
+    if bucket == "raw":
+        query = raw_history_query(symbol, start, end, points)
+    else:
+        query = bucketed_history_query(symbol, start, end, bucket, points)
+    
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        return StreamingResponse(
+            _stream_points(query),
+            media_type="application/x-ndjson",
+            headers={"X-Score-Bucket": bucket}
+        )
+    
+    if rows is None:
+        rows = (await db.execute(query)).all()
+    return ScoreHistoryResponse(
+        symbol=symbol,
+        bucket=bucket,
+        start=start,
+        end=end,
+        points=[ScorePoint.model_validate(row._mapping) for row in rows]
+    )
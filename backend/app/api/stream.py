@@ -0,0 +1,106 @@
+"""
+Quote Stream API Routes
+Server-Sent Events stream of live quote changes for symbols or a watchlist
+"""
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from typing import AsyncIterator, Dict, Optional, Set
+import json
+import logging
+
+from ..database import AsyncSessionLocal
+from ..models import Watchlist, WatchlistItem
+from ..schemas import QuoteResponse
+from ..services.quote_stream import QuoteBroadcaster, get_quote_broadcaster
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/stream", tags=["stream"])
+
+# Fields that change on every refresh without the quote itself changing
+_VOLATILE_FIELDS = ("timestamp", "age_seconds")
+
+def _quote_delta(record: Dict, previous: Optional[Dict]) -> Optional[Dict]:
+    """Full record the first time, afterwards only changed fields (None if nothing changed)"""
+    if previous is None:
+        return record
+    changed = {
+        key: value for key, value in record.items()
+        if key not in _VOLATILE_FIELDS and previous.get(key) != value
+    }
+    if not changed:
+        return None
+    return {"symbol": record["symbol"], "timestamp": record["timestamp"], **changed}
+
+def _event(name: str, data: Dict) -> str:
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+async def _quote_events(
+    request: Request,
+    broadcaster: QuoteBroadcaster,
+    symbols: Set[str]
+) -> AsyncIterator[str]:
+    subscription = broadcaster.subscribe(symbols)
+    sent: Dict[str, Dict] = {}
+    try:
+        # Start with whatever is cached; the rest arrives as it is fetched
+        updates = sorted(symbols)
+        while True:
+            for symbol in updates:
+                quote = broadcaster.market_service.cached_quote(symbol)
+                if quote is None:
+                    continue
+                record = QuoteResponse.model_validate(quote, from_attributes=True).model_dump(mode="json")
+                delta = _quote_delta(record, sent.get(symbol))
+                sent[symbol] = record
+                if delta:
+                    yield _event("quote", delta)
+
+            if await request.is_disconnected():
+                break
+            updates = await subscription.next_updates(broadcaster.heartbeat)
+            if not updates:
+                yield ": keepalive\n\n"
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+@router.get("/quotes")
+async def stream_quotes(
+    request: Request,
+    symbols: Optional[str] = None,
+    watchlist_id: Optional[int] = None
+):
+    """
+    Stream quote changes as Server-Sent Events for comma-separated symbols
+    and/or the symbols of a watchlist. Each symbol's first "quote" event is the
+    full record; later events carry only the fields that changed.
+    """
+    requested = {symbol.strip().upper() for symbol in (symbols or "").split(",") if symbol.strip()}
+
+    if watchlist_id is not None:
+        # Short-lived session: the stream itself must not hold a database connection
+        async with AsyncSessionLocal() as db:
+            if not await db.get(Watchlist, watchlist_id):
+                raise HTTPException(status_code=404, detail="Watchlist not found")
+            requested.update((await db.execute(
+                select(WatchlistItem.symbol).where(WatchlistItem.watchlist_id == watchlist_id)
+            )).scalars().all())
+
+    if not requested:
+        raise HTTPException(status_code=400, detail="Provide symbols or a watchlist_id")
+
+    broadcaster = await get_quote_broadcaster()
+    if len(requested) > broadcaster.max_symbols:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {broadcaster.max_symbols} symbols can be streamed"
+        )
+
+    logger.info(f"Streaming quotes for {len(requested)} symbols")
+    return StreamingResponse(
+        _quote_events(request, broadcaster, requested),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
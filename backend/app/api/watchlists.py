@@ -3,187 +3,351 @@ Watchlists API Routes
 Endpoints for managing user watchlists and items with live market data
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, selectinload
-from sqlalchemy.exc import IntegrityError
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
+from sqlalchemy import select, delete, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only
+from typing import Dict, List
 import logging
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models import User, Watchlist, WatchlistItem, Security
 from ..schemas import (
-    WatchlistResponse, 
+    WatchlistResponse,
     WatchlistCreate,
     WatchlistItemResponse,
-    WatchlistItemCreate
+    WatchlistItemCreate,
+    WatchlistItemBulkUpdate,
+    WatchlistItemBulkResult,
+    WatchlistItemBulkResponse,
+    UserWatchlistsResponse
 )
-from ..services.market_data import get_market_data_service
+from ..services.market_data import get_market_data_service, PRICE_FIELDS
+from ..services.request_timing import timed
+from ..services.response_cache import response_cache
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/users", tags=["watchlists"])
 
-@router.get("/{user_id}/watchlists", response_model=List[WatchlistResponse])
-async def get_user_watchlists(
-    user_id: int,
-    db: Session = Depends(get_db)
-):
+MAX_USERS_PER_REQUEST = 100
+MAX_BULK_SYMBOLS = 1000
+
+_watchlists_adapter = TypeAdapter(List[WatchlistResponse])
+_user_watchlists_adapter = TypeAdapter(List[UserWatchlistsResponse])
+
+def _invalidate_user(user_id: int):
+    response_cache.invalidate(f"/api/users/{user_id}/watchlists")
+    # Multi-user responses can include any user
+    response_cache.invalidate("/api/users/watchlists")
+
+def _users_with_watchlists():
     """
-    Get all watchlists for a user with live market data
+    Users with their watchlists, items and securities in one joined statement.
+    Only the user id is loaded: emails and password hashes are never returned.
     """
-    # Check if user exists
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    watchlists = db.query(Watchlist).options(
-        selectinload(Watchlist.items).selectinload(WatchlistItem.security)
-    ).filter(Watchlist.user_id == user_id).all()
+    return select(User).options(
+        load_only(User.id),
+        joinedload(User.watchlists).joinedload(Watchlist.items).joinedload(WatchlistItem.security)
+    )
+
+async def _enrich_watchlists(watchlists: List[Watchlist]):
+    """Attach live market data to every distinct security in the watchlists, in one pass"""
+    securities: Dict[str, Security] = {
+        item.security.symbol: item.security
+        for watchlist in watchlists
+        for item in watchlist.items
+        if item.security
+    }
+    if not securities:
+        return
     
-    # Enrich securities with live market data
     try:
         market_service = await get_market_data_service()
         
-        # Collect all unique symbols from all watchlists
-        all_symbols = set()
-        for watchlist in watchlists:
-            for item in watchlist.items:
-                if item.security:
-                    all_symbols.add(item.security.symbol)
+        # Fetch live data for all symbols concurrently
+        with timed("enrich"):
+            live_quotes = await market_service.get_multiple_quotes(list(securities), required_fields=PRICE_FIELDS)
         
-        if all_symbols:
-            # Fetch live data for all symbols concurrently
-            live_quotes = await market_service.get_multiple_quotes(list(all_symbols))
+        # Securities are shared across items, so each one is enriched once
+        for symbol, security in securities.items():
+            quote = live_quotes.get(symbol)
+            if quote is None:
+                continue
             
-            # Enrich each security with live data
-            for watchlist in watchlists:
-                for item in watchlist.items:
-                    if item.security and item.security.symbol in live_quotes:
-                        security = item.security
-                        quote = live_quotes[security.symbol]
-                        
-                        # Add live data to security object
-                        security.live_price = quote.price
-                        security.price_change_percent = quote.change_percent
-                        security.last_updated = quote.timestamp
-                        security.data_source = quote.source
-                        
-                        # Update sector if available from live data and not in DB
-                        if quote.sector and not security.sector:
-                            security.sector = quote.sector
-                        
-                        # Update market cap if available from live data
-                        if quote.market_cap is not None:
-                            security.live_market_cap = quote.market_cap
+            # Add live data to security object
+            security.live_price = quote.price
+            security.price_change_percent = quote.change_percent
+            security.last_updated = quote.timestamp
+            security.data_source = quote.source
             
-            logger.info(f"Enriched {len(all_symbols)} securities in watchlists with live market data")
+            # Update sector if available from live data and not in DB
+            if quote.sector and not security.sector:
+                security.sector = quote.sector
             
+            # Update market cap if available from live data
+            if quote.market_cap is not None:
+                security.live_market_cap = quote.market_cap
+        
+        logger.info(f"Enriched {len(securities)} securities in watchlists with live market data")
+    
     except Exception as e:
         logger.error(f"Error enriching watchlist securities with live data: {e}")
         # Continue without live data - graceful degradation
+
+@router.get("/watchlists", response_model=List[UserWatchlistsResponse])
+async def get_watchlists_for_users(
+    request: Request,
+    user_ids: str = Query(..., description="Comma-separated user ids"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get the watchlists of many users in one call, with live market data.
+    Unknown users are left out of the response.
+    """
+    try:
+        ids = list(dict.fromkeys(int(user_id) for user_id in user_ids.split(",") if user_id.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="user_ids must be comma-separated integers")
+    if not ids:
+        raise HTTPException(status_code=400, detail="No user ids given")
+    if len(ids) > MAX_USERS_PER_REQUEST:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_USERS_PER_REQUEST} users per request")
+    
+    cache_key = response_cache.key(request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return response_cache.respond(request, cached)
+    
+    users = {
+        user.id: user
+        for user in (await db.execute(
+            _users_with_watchlists().where(User.id.in_(ids))
+        )).unique().scalars().all()
+    }
+    ordered = [users[user_id] for user_id in ids if user_id in users]
+    
+    await _enrich_watchlists([watchlist for user in ordered for watchlist in user.watchlists])
+    
+    with timed("serialize"):
+        body = _user_watchlists_adapter.dump_json([
+            UserWatchlistsResponse(
+                user_id=user.id,
+                watchlists=_watchlists_adapter.validate_python(user.watchlists, from_attributes=True)
+            )
+            for user in ordered
+        ])
+    entry = response_cache.store(cache_key, body)
+    return response_cache.respond(request, entry)
+
+@router.get("/{user_id}/watchlists", response_model=List[WatchlistResponse])
+async def get_user_watchlists(
+    user_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get all watchlists for a user with live market data
+    """
+    cache_key = response_cache.key(request)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return response_cache.respond(request, cached)
     
-    return watchlists
+    # The user is the root of the query, so a missing user is simply no row
+    user = (await db.execute(
+        _users_with_watchlists().where(User.id == user_id)
+    )).unique().scalars().first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    watchlists = user.watchlists
+    await _enrich_watchlists(watchlists)
+    
+    with timed("serialize"):
+        body = _watchlists_adapter.dump_json(_watchlists_adapter.validate_python(watchlists, from_attributes=True))
+    entry = response_cache.store(cache_key, body)
+    return response_cache.respond(request, entry)
 
 @router.post("/{user_id}/watchlists", response_model=WatchlistResponse)
 async def create_watchlist(
     user_id: int,
     watchlist: WatchlistCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create new watchlist for user
     """
-    # Check if user exists
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    # Inserting from a select on users doubles as the existence check
+    created = (await db.execute(
+        insert(Watchlist)
+        .from_select(
+            ["user_id", "name"],
+            select(User.id, literal(watchlist.name)).where(User.id == user_id)
+        )
+        .returning(Watchlist.id, Watchlist.user_id, Watchlist.name, Watchlist.created_at)
+    )).first()
+    if not created:
         raise HTTPException(status_code=404, detail="User not found")
+    await db.commit()
+    _invalidate_user(user_id)
     
-    # Create new watchlist
-    db_watchlist = Watchlist(
-        user_id=user_id,
-        name=watchlist.name
+    return WatchlistResponse(
+        id=created.id,
+        user_id=created.user_id,
+        name=created.name,
+        created_at=created.created_at,
+        item_count=0,
+        symbols=[],
+        items=[]
     )
-    
-    db.add(db_watchlist)
-    db.commit()
-    db.refresh(db_watchlist)
-    
-    return db_watchlist
 
 @router.post("/watchlists/{watchlist_id}/items", response_model=WatchlistItemResponse)
 async def add_watchlist_item(
     watchlist_id: int,
     item: WatchlistItemCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Add security to watchlist
     """
-    # Check if watchlist exists
-    watchlist = db.query(Watchlist).filter(Watchlist.id == watchlist_id).first()
+    symbol = item.symbol.upper()
+    
+    # One statement: insert only if both the watchlist and the security exist and the
+    # item is new, returning the item with its watchlist owner and security
+    inserted = (
+        insert(WatchlistItem)
+        .from_select(
+            ["watchlist_id", "symbol"],
+            select(Watchlist.id, Security.symbol)
+            .join(Security, Security.symbol == symbol)
+            .where(Watchlist.id == watchlist_id)
+        )
+        .on_conflict_do_nothing(index_elements=["watchlist_id", "symbol"])
+        .returning(WatchlistItem.id, WatchlistItem.watchlist_id, WatchlistItem.symbol, WatchlistItem.added_at)
+        .cte("inserted")
+    )
+    row = (await db.execute(
+        select(inserted, Watchlist.user_id, Security)
+        .join(Watchlist, Watchlist.id == inserted.c.watchlist_id)
+        .join(Security, Security.symbol == inserted.c.symbol)
+    )).first()
+    
+    if not row:
+        # Nothing inserted: work out why only on this error path
+        await db.rollback()
+        if not await db.get(Watchlist, watchlist_id):
+            raise HTTPException(status_code=404, detail="Watchlist not found")
+        if not await db.get(Security, symbol):
+            raise HTTPException(status_code=404, detail="Security not found")
+        raise HTTPException(status_code=400, detail="Security already in watchlist")
+    
+    await db.commit()
+    _invalidate_user(row.user_id)
+    
+    return WatchlistItemResponse(
+        id=row.id,
+        watchlist_id=row.watchlist_id,
+        symbol=row.symbol,
+        added_at=row.added_at,
+        security=row.Security
+    )
+
+@router.post("/watchlists/{watchlist_id}/items/bulk", response_model=WatchlistItemBulkResponse)
+async def bulk_update_watchlist_items(
+    watchlist_id: int,
+    update: WatchlistItemBulkUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Add and remove many securities in one transaction, with a result per symbol
+    """
+    to_add = list(dict.fromkeys(symbol.strip().upper() for symbol in update.add if symbol.strip()))
+    to_remove = list(dict.fromkeys(symbol.strip().upper() for symbol in update.remove if symbol.strip()))
+    if len(to_add) + len(to_remove) > MAX_BULK_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_SYMBOLS} symbols per request")
+    conflicting = sorted(set(to_add) & set(to_remove))
+    if conflicting:
+        raise HTTPException(status_code=400, detail=f"Symbols both added and removed: {', '.join(conflicting)}")
+    
+    watchlist = await db.get(Watchlist, watchlist_id)
     if not watchlist:
         raise HTTPException(status_code=404, detail="Watchlist not found")
     
-    # Check if security exists
-    security = db.query(Security).filter(Security.symbol == item.symbol.upper()).first()
-    if not security:
-        raise HTTPException(status_code=404, detail="Security not found")
+    results: List[WatchlistItemBulkResult] = []
+    added: set = set()
+    removed: set = set()
     
-    # Check if item already exists
-    existing_item = db.query(WatchlistItem).filter(
-        WatchlistItem.watchlist_id == watchlist_id,
-        WatchlistItem.symbol == item.symbol.upper()
-    ).first()
+    if to_add:
+        # All symbols are validated in one query and inserted in one statement
+        known = set((await db.execute(
+            select(Security.symbol).where(Security.symbol.in_(to_add))
+        )).scalars().all())
+        if known:
+            added = set((await db.execute(
+                insert(WatchlistItem)
+                .values([{"watchlist_id": watchlist_id, "symbol": symbol} for symbol in to_add if symbol in known])
+                .on_conflict_do_nothing(index_elements=["watchlist_id", "symbol"])
+                .returning(WatchlistItem.symbol)
+            )).scalars().all())
+        for symbol in to_add:
+            status = "added" if symbol in added else "already_in_watchlist" if symbol in known else "security_not_found"
+            results.append(WatchlistItemBulkResult(symbol=symbol, action="add", status=status))
     
-    if existing_item:
-        raise HTTPException(status_code=400, detail="Security already in watchlist")
+    if to_remove:
+        removed = set((await db.execute(
+            delete(WatchlistItem)
+            .where(WatchlistItem.watchlist_id == watchlist_id, WatchlistItem.symbol.in_(to_remove))
+            .returning(WatchlistItem.symbol)
+        )).scalars().all())
+        for symbol in to_remove:
+            status = "removed" if symbol in removed else "not_in_watchlist"
+            results.append(WatchlistItemBulkResult(symbol=symbol, action="remove", status=status))
+    
+    await db.commit()
+    if added or removed:
+        _invalidate_user(watchlist.user_id)
     
-    # Create new watchlist item
-    db_item = WatchlistItem(
+    logger.info(f"Bulk update of watchlist {watchlist_id}: {len(added)} added, {len(removed)} removed")
+    return WatchlistItemBulkResponse(
         watchlist_id=watchlist_id,
-        symbol=item.symbol.upper()
+        added=len(added),
+        removed=len(removed),
+        results=results
     )
-    
-    try:
-        db.add(db_item)
-        db.commit()
-        db.refresh(db_item)
-        
-        # Load the security relationship
-        db_item = db.query(WatchlistItem).options(
-            selectinload(WatchlistItem.security)
-        ).filter(WatchlistItem.id == db_item.id).first()
-        
-        return db_item
-        
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(status_code=400, detail="Security already in watchlist")
 
 @router.delete("/watchlists/{watchlist_id}/items/{symbol}")
 async def remove_watchlist_item(
     watchlist_id: int,
     symbol: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Remove security from watchlist
     """
-    # Check if watchlist exists
-    watchlist = db.query(Watchlist).filter(Watchlist.id == watchlist_id).first()
-    if not watchlist:
-        raise HTTPException(status_code=404, detail="Watchlist not found")
-    
-    # Find and delete the item
-    item = db.query(WatchlistItem).filter(
-        WatchlistItem.watchlist_id == watchlist_id,
-        WatchlistItem.symbol == symbol.upper()
-    ).first()
+    # One statement: delete the item and return the watchlist owner for cache invalidation
+    deleted = (
+        delete(WatchlistItem)
+        .where(
+            WatchlistItem.watchlist_id == watchlist_id,
+            WatchlistItem.symbol == symbol.upper()
+        )
+        .returning(WatchlistItem.watchlist_id)
+        .cte("deleted")
+    )
+    user_id = (await db.execute(
+        select(Watchlist.user_id).join(deleted, deleted.c.watchlist_id == Watchlist.id)
+    )).scalar()
     
-    if not item:
+    if user_id is None:
+        await db.rollback()
+        if not await db.get(Watchlist, watchlist_id):
+            raise HTTPException(status_code=404, detail="Watchlist not found")
         raise HTTPException(status_code=404, detail="Item not found in watchlist")
     
-    db.delete(item)
-    db.commit()
+    await db.commit()
+    _invalidate_user(user_id)
     
     return {"message": f"Removed {symbol.upper()} from watchlist"}
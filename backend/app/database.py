@@ -4,12 +4,22 @@ AiiA FastAPI Database Configuration
 SQLAlchemy setup with PostgreSQL connection
 """
 
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, MetaData, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from typing import Any, Dict, Optional, Tuple
 import os
+import ssl
+import logging
 from dotenv import load_dotenv
 
+from .services.metrics import metered_pool, pool_usage
+from .services.request_timing import track_query_time
+
+logger = logging.getLogger(__name__)
+
 # Load environment variables
 load_dotenv()
 
@@ -24,12 +34,86 @@ engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
     pool_recycle=300,
+    poolclass=metered_pool(DATABASE_URL, "sync"),
     echo=False  # Set to True for SQL query logging
 )
+pool_usage.register("sync", lambda: engine.pool)
+track_query_time(engine)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# libpq parameters asyncpg takes under the same name
+_ASYNCPG_PASSTHROUGH = ("target_session_attrs", "passfile")
+
+def _ssl_context(mode: Optional[str], rootcert: Optional[str], cert: Optional[str], key: Optional[str]) -> ssl.SSLContext:
+    """SSL context following libpq's sslmode rules for the given certificate files"""
+    context = ssl.create_default_context(cafile=rootcert)
+    if mode != "verify-full":
+        context.check_hostname = False
+    # Like libpq, require with a root certificate verifies the server (as verify-ca)
+    if mode not in ("verify-ca", "verify-full") and not rootcert:
+        context.verify_mode = ssl.CERT_NONE
+    if cert:
+        context.load_cert_chain(cert, key)
+    return context
+
+def _async_database_url(url: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Derive the asyncpg URL and connect arguments from a psycopg2-style DATABASE_URL.
+    Supported libpq parameters: sslmode, sslrootcert, sslcert, sslkey, connect_timeout,
+    application_name, options, target_session_attrs and passfile. Others are dropped,
+    since asyncpg rejects unknown connect arguments.
+    """
+    parsed = make_url(url)
+    if parsed.drivername not in ("postgres", "postgresql", "postgresql+psycopg2"):
+        return url, {}
+    
+    query = dict(parsed.query)
+    asyncpg_query = {name: query.pop(name) for name in _ASYNCPG_PASSTHROUGH if name in query}
+    connect_args: Dict[str, Any] = {}
+    
+    # asyncpg takes "ssl" where libpq takes "sslmode", and certificates as an SSL context
+    sslmode = query.pop("sslmode", None)
+    certificates = [query.pop(name, None) for name in ("sslrootcert", "sslcert", "sslkey")]
+    if any(certificates) and sslmode != "disable":
+        connect_args["ssl"] = _ssl_context(sslmode, *certificates)
+    elif sslmode:
+        asyncpg_query["ssl"] = sslmode
+    
+    if "connect_timeout" in query:
+        connect_args["timeout"] = float(query.pop("connect_timeout"))
+    
+    # Sent in the startup packet like libpq does; options carries "-c name=value" settings
+    server_settings = {name: query.pop(name) for name in ("application_name", "options") if name in query}
+    if server_settings:
+        connect_args["server_settings"] = server_settings
+    
+    if query:
+        logger.warning(f"Ignoring DATABASE_URL parameters asyncpg does not support: {', '.join(sorted(query))}")
+    async_url = parsed.set(drivername="postgresql+asyncpg", query=asyncpg_query).render_as_string(hide_password=False)
+    return async_url, connect_args
+
+# Async engine (asyncpg) used by the API routes so DB I/O doesn't block the event loop
+if os.getenv("ASYNC_DATABASE_URL"):
+    ASYNC_DATABASE_URL, _async_connect_args = os.getenv("ASYNC_DATABASE_URL"), {}
+else:
+    ASYNC_DATABASE_URL, _async_connect_args = _async_database_url(DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    pool_recycle=300,
+    poolclass=metered_pool(ASYNC_DATABASE_URL, "async"),
+    connect_args=_async_connect_args,
+    echo=False
+)
+pool_usage.register("async", lambda: async_engine.pool)
+track_query_time(async_engine.sync_engine)
+
+# Objects stay usable after commit; async sessions can't lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -44,13 +128,27 @@ def get_db():
     finally:
         db.close()
 
+# Async database dependency for FastAPI
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # Test database connection
 def test_connection():
     try:
         with engine.connect() as connection:
-            from sqlalchemy import text
             result = connection.execute(text("SELECT 1"))
             return True
     except Exception as e:
         print(f"Database connection failed: {e}")
         return False
+
+# Test database connection without blocking the event loop
+async def test_async_connection():
+    try:
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            return True
+    except Exception as e:
+        print(f"Database connection failed: {e}")
+        return False
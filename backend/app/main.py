@@ -9,26 +9,41 @@ import os
 # Load environment variables from .env file
 load_dotenv()
 
-from fastapi import FastAPI, Response
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import time
 
-from .database import test_connection
-from .api import securities_router, watchlists_router
-from .services.market_data import cleanup_market_data_service
+from .database import test_async_connection
+from .api import securities_router, watchlists_router, stream_router, quotes_router, scores_router
+from .services.market_data import get_market_data_service, cleanup_market_data_service
+from .services.prefetch import PrefetchScheduler
+from .services.quote_stream import get_quote_broadcaster, cleanup_quote_broadcaster
+from .services.metrics import METRICS_CONTENT_TYPE, ROUTE_LATENCY, render_metrics
+from .services.request_timing import ServerTimingMiddleware
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("\U0001f680 Starting AiiA FastAPI Backend...")
-    if test_connection():
+    if await test_async_connection():
         print("\u2705 Database connection successful")
     else:
         print("\u274c Database connection failed")
     
     print("\u2705 Market data service initialized")
+    
+    quote_broadcaster = await get_quote_broadcaster()
+    await quote_broadcaster.start()
+    
+    prefetch_scheduler = PrefetchScheduler(await get_market_data_service(), quote_broadcaster)
+    if os.getenv("PREFETCH_ENABLED", "true").lower() == "true":
+        await prefetch_scheduler.start()
+        print("\u2705 Quote prefetch scheduler started")
     yield
     
     # Cleanup
+    await prefetch_scheduler.stop()
+    await cleanup_quote_broadcaster()
     await cleanup_market_data_service()
     print("\U0001f6d1 Shutting down AiiA FastAPI Backend...")
 
@@ -52,10 +67,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Score-Bucket", "Server-Timing"],
 )
 
+app.add_middleware(ServerTimingMiddleware)
+
+@app.middleware("http")
+async def record_route_latency(request: Request, call_next):
+    """Time each request (to the start of the response body) by its route template"""
+    start = time.monotonic()
+    response = await call_next(request)
+    # The template, not the raw path, so /api/securities/AAPL and /MSFT share a series
+    route = request.scope.get("route")
+    ROUTE_LATENCY.labels(
+        request.method, getattr(route, "path", "unmatched"), str(response.status_code)
+    ).observe(time.monotonic() - start)
+    return response
+
 app.include_router(securities_router, prefix="/api")
 app.include_router(watchlists_router, prefix="/api")
+app.include_router(stream_router, prefix="/api")
+app.include_router(quotes_router, prefix="/api")
+app.include_router(scores_router, prefix="/api")
 
 @app.options("/{rest_of_path:path}")
 async def options_handler(rest_of_path: str):
@@ -71,13 +104,20 @@ async def root():
 
 @app.get("/api/health")
 async def api_health_check():
-    db_status = test_connection()
+    db_status = await test_async_connection()
+    market_service = await get_market_data_service()
     return {
         "status": "healthy" if db_status else "unhealthy",
         "database": "connected" if db_status else "disconnected",
-        "service": "AiiA FastAPI Backend"
+        "service": "AiiA FastAPI Backend",
+        "providers": market_service.provider_status()
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/api/debug/quote/{symbol}")
 async def debug_quote(symbol: str):
     try:
@@ -7,7 +7,8 @@ Database ORM models matching the PostgreSQL schema
 from .user import User
 from .security import Security
 from .score import Score
+from .security_latest_score import SecurityLatestScore
 from .watchlist import Watchlist
 from .watchlist_item import WatchlistItem
 
-__all__ = ["User", "Security", "Score", "Watchlist", "WatchlistItem"]
+__all__ = ["User", "Security", "Score", "SecurityLatestScore", "Watchlist", "WatchlistItem"]
@@ -3,7 +3,7 @@
 Score SQLAlchemy Model
 """
 
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from sqlalchemy import ForeignKey
@@ -18,6 +18,11 @@ class Score(Base):
     calculated_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     factor_breakdown_json = Column(JSON)
 
+    __table_args__ = (
+        # Serves "latest score per symbol" lookups without touching older history
+        Index("scores_symbol_calculated_at_idx", symbol, calculated_at.desc()),
+    )
+
     # Relationships
     security = relationship("Security", back_populates="scores")
 
@@ -44,10 +49,11 @@ class Score(Base):
     @property
     def recommendation(self):
         """Get recommendation from factor breakdown or generate based on score"""
+        # Mirrors score_recommendation() in the add_security_latest_score migration
         if self.factor_breakdown_json and isinstance(self.factor_breakdown_json, dict):
-            explanation = self.factor_breakdown_json.get("explanation", {})
-            if "recommendation" in explanation:
-                return explanation["recommendation"]
+            explanation = self.factor_breakdown_json.get("explanation")
+            if isinstance(explanation, dict) and explanation.get("recommendation") is not None:
+                return str(explanation["recommendation"])
         
         # Generate recommendation based on score
         if self.score_value >= 80:
@@ -3,7 +3,7 @@
 Security SQLAlchemy Model
 """
 
-from sqlalchemy import Column, String, BigInteger, Boolean
+from sqlalchemy import Column, String, BigInteger, Boolean, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -16,6 +16,11 @@ class Security(Base):
     market_cap = Column(BigInteger)
     is_active = Column(Boolean, default=True, index=True)
 
+    __table_args__ = (
+        # Sector filter with the default symbol ordering
+        Index("securities_sector_symbol_idx", sector, symbol),
+    )
+
     # Relationships
     scores = relationship("Score", back_populates="security", cascade="all, delete-orphan")
     watchlist_items = relationship("WatchlistItem", back_populates="security", cascade="all, delete-orphan")
@@ -23,10 +28,17 @@ class Security(Base):
     @property
     def latest_score(self):
         """Get the most recent score for this security"""
+        # Set directly when loaded by the latest-score query, so history isn't needed
+        if "_latest_score" in self.__dict__:
+            return self._latest_score
         if self.scores:
             return max(self.scores, key=lambda s: s.calculated_at)
         return None
 
+    @latest_score.setter
+    def latest_score(self, score):
+        self._latest_score = score
+
     @property
     def market_cap_formatted(self):
         """Format market cap in billions/trillions"""
@@ -0,0 +1,28 @@
+"""
+Security Latest Score SQLAlchemy Model
+"""
+
+from sqlalchemy import Column, Integer, String, Text, Numeric, DateTime, JSON, Index
+from sqlalchemy import ForeignKey
+from ..database import Base
+
+class SecurityLatestScore(Base):
+    """
+    Each security's most recent score with its grade and recommendation, kept
+    current by triggers on the scores table (see the add_security_latest_score
+    migration). Read-only from the application.
+    """
+    __tablename__ = "security_latest_score"
+
+    symbol = Column(String(10), ForeignKey("securities.symbol", ondelete="CASCADE"), primary_key=True)
+    # Named like Score.id so it serializes as a ScoreResponse
+    id = Column("score_id", Integer, nullable=False)
+    score_value = Column(Numeric(5, 2), nullable=False)
+    calculated_at = Column(DateTime(timezone=True), nullable=False)
+    factor_breakdown_json = Column(JSON)
+    score_grade = Column(String(2), nullable=False)
+    recommendation = Column(Text, nullable=False)
+
+    __table_args__ = (
+        Index("security_latest_score_score_value_symbol_idx", score_value, symbol),
+    )
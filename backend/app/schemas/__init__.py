@@ -5,15 +5,25 @@ Request and response validation models
 """
 
 from .user import UserBase, UserResponse
-from .security import SecurityBase, SecurityResponse, SecurityWithScore
-from .score import ScoreBase, ScoreResponse, FactorBreakdown
-from .watchlist import WatchlistBase, WatchlistCreate, WatchlistResponse
-from .watchlist_item import WatchlistItemBase, WatchlistItemCreate, WatchlistItemResponse
+from .security import SecurityBase, SecurityResponse, SecurityWithScore, SymbolValidityResponse
+from .score import (
+    ScoreBase, ScoreCreate, ScoreResponse, FactorBreakdown, ScoreIngestError, ScoreIngestResult,
+    ScorePoint, ScoreHistoryResponse
+)
+from .watchlist import WatchlistBase, WatchlistCreate, WatchlistResponse, UserWatchlistsResponse
+from .watchlist_item import (
+    WatchlistItemBase, WatchlistItemCreate, WatchlistItemResponse,
+    WatchlistItemBulkUpdate, WatchlistItemBulkResult, WatchlistItemBulkResponse
+)
+from .quote import QuoteResponse
 
 __all__ = [
     "UserBase", "UserResponse",
-    "SecurityBase", "SecurityResponse", "SecurityWithScore", 
-    "ScoreBase", "ScoreResponse", "FactorBreakdown",
-    "WatchlistBase", "WatchlistCreate", "WatchlistResponse",
-    "WatchlistItemBase", "WatchlistItemCreate", "WatchlistItemResponse"
+    "SecurityBase", "SecurityResponse", "SecurityWithScore", "SymbolValidityResponse",
+    "ScoreBase", "ScoreCreate", "ScoreResponse", "FactorBreakdown", "ScoreIngestError", "ScoreIngestResult",
+    "ScorePoint", "ScoreHistoryResponse",
+    "WatchlistBase", "WatchlistCreate", "WatchlistResponse", "UserWatchlistsResponse",
+    "WatchlistItemBase", "WatchlistItemCreate", "WatchlistItemResponse",
+    "WatchlistItemBulkUpdate", "WatchlistItemBulkResult", "WatchlistItemBulkResponse",
+    "QuoteResponse"
 ]
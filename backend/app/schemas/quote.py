@@ -0,0 +1,21 @@
+"""
+Quote Pydantic Schemas
+"""
+
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class QuoteResponse(BaseModel):
+    symbol: str
+    price: Optional[float] = None
+    change_percent: Optional[float] = None
+    sector: Optional[str] = None
+    market_cap: Optional[float] = None
+    timestamp: Optional[datetime] = None
+    source: Optional[str] = None
+    age_seconds: Optional[float] = None
+    is_stale: bool = False
+
+    class Config:
+        from_attributes = True
@@ -3,7 +3,7 @@
 Score Pydantic Schemas
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from decimal import Decimal
 from datetime import datetime
 from typing import Optional, Dict, Any, List
@@ -19,6 +19,36 @@ class ScoreBase(BaseModel):
     symbol: str
     score_value: Decimal
 
+class ScoreCreate(ScoreBase):
+    score_value: Decimal = Field(ge=0, le=100, max_digits=5, decimal_places=2)
+    calculated_at: Optional[datetime] = None
+    factor_breakdown_json: Optional[FactorBreakdown] = None
+
+class ScoreIngestError(BaseModel):
+    line: int
+    error: str
+
+class ScoreIngestResult(BaseModel):
+    received: int
+    inserted: int
+    rejected: int
+    errors: List[ScoreIngestError]
+
+class ScorePoint(BaseModel):
+    time: datetime
+    value: Decimal  # Last score in the bucket
+    avg: Decimal
+    min: Decimal
+    max: Decimal
+    count: int
+
+class ScoreHistoryResponse(BaseModel):
+    symbol: str
+    bucket: str
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    points: List[ScorePoint]
+
 class ScoreResponse(ScoreBase):
     id: int
     calculated_at: datetime
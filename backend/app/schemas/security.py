@@ -27,6 +27,12 @@ class SecurityResponse(SecurityBase):
     class Config:
         from_attributes = True
 
+class SymbolValidityResponse(BaseModel):
+    symbol: str
+    misses: int
+    last_checked: datetime
+    retry_at: datetime
+
 class SecurityWithScore(SecurityResponse):
     latest_score: Optional[ScoreResponse] = None
 
@@ -24,3 +24,7 @@ class WatchlistResponse(WatchlistBase):
 
     class Config:
         from_attributes = True
+
+class UserWatchlistsResponse(BaseModel):
+    user_id: int
+    watchlists: List[WatchlistResponse]
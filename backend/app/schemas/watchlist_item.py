@@ -5,7 +5,7 @@ WatchlistItem Pydantic Schemas
 
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 from .security import SecurityResponse
 
 class WatchlistItemBase(BaseModel):
@@ -22,3 +22,18 @@ class WatchlistItemResponse(WatchlistItemBase):
 
     class Config:
         from_attributes = True
+
+class WatchlistItemBulkUpdate(BaseModel):
+    add: List[str] = []
+    remove: List[str] = []
+
+class WatchlistItemBulkResult(BaseModel):
+    symbol: str
+    action: Literal["add", "remove"]
+    status: Literal["added", "already_in_watchlist", "security_not_found", "removed", "not_in_watchlist"]
+
+class WatchlistItemBulkResponse(BaseModel):
+    watchlist_id: int
+    added: int
+    removed: int
+    results: List[WatchlistItemBulkResult]
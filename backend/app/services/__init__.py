@@ -1,4 +1,3 @@
-
 """
-Services package for market data and external APIs
+Services package for market data, external APIs and score queries
 """
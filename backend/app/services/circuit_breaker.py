@@ -0,0 +1,129 @@
+"""
+Provider Circuit Breakers
+Stop calling a market data provider while it is failing or too slow
+"""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker driven by error rate and slow-call rate
+    over a sliding time window
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window: float = 60.0,
+        min_calls: int = 5,
+        error_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        slow_rate_threshold: float = 0.5,
+        open_seconds: float = 30.0,
+        probe_timeout: float = 15.0
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate_threshold = slow_rate_threshold
+        self.open_seconds = open_seconds
+        self.probe_timeout = probe_timeout
+
+        self.state = self.CLOSED
+        self.opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+        # (time, ok, slow) for each call in the window
+        self._outcomes: Deque[Tuple[float, bool, bool]] = deque()
+
+    def _prune(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def _rates(self) -> Tuple[float, float]:
+        calls = len(self._outcomes)
+        if not calls:
+            return 0.0, 0.0
+        errors = sum(1 for _, ok, _ in self._outcomes if not ok)
+        slow = sum(1 for _, _, is_slow in self._outcomes if is_slow)
+        return errors / calls, slow / calls
+
+    def _open(self, now: float, reason: str):
+        self.state = self.OPEN
+        self.opened_at = now
+        self._probe_started = None
+        logger.warning(f"Circuit opened for {self.name}: {reason}")
+
+    def allow_request(self) -> bool:
+        """Check whether a call may go to the provider (reserves the probe when half-open)"""
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            if now - self.opened_at < self.open_seconds:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_started = None
+
+        if self.state == self.HALF_OPEN:
+            # One probe at a time; a probe that never reported back is replaced after a timeout
+            if self._probe_started is not None and now - self._probe_started < self.probe_timeout:
+                return False
+            self._probe_started = now
+            return True
+
+        return True
+
+    def release_probe(self):
+        """Free the half-open probe of a call that ended without an outcome, so another may be sent"""
+        if self.state == self.HALF_OPEN:
+            self._probe_started = None
+
+    def record(self, latency: float, ok: bool):
+        """Record the outcome of a provider call"""
+        now = time.monotonic()
+        slow = latency > self.slow_call_seconds
+
+        if self.state == self.HALF_OPEN:
+            if ok and not slow:
+                self.state = self.CLOSED
+                self.opened_at = None
+                self._probe_started = None
+                self._outcomes.clear()
+                logger.info(f"Circuit closed for {self.name}")
+            else:
+                self._open(now, "probe call failed")
+            return
+
+        self._outcomes.append((now, ok, slow))
+        self._prune(now)
+        if self.state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+            error_rate, slow_rate = self._rates()
+            if error_rate >= self.error_rate_threshold:
+                self._open(now, f"error rate {error_rate:.0%}")
+            elif slow_rate >= self.slow_rate_threshold:
+                self._open(now, f"slow call rate {slow_rate:.0%}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current breaker state for health reporting"""
+        now = time.monotonic()
+        self._prune(now)
+        error_rate, slow_rate = self._rates()
+        retry_in = None
+        if self.state == self.OPEN:
+            retry_in = round(max(0.0, self.open_seconds - (now - self.opened_at)), 1)
+        return {
+            "state": self.state,
+            "calls": len(self._outcomes),
+            "error_rate": round(error_rate, 3),
+            "slow_call_rate": round(slow_rate, 3),
+            "retry_in_seconds": retry_in,
+        }
@@ -0,0 +1,49 @@
+"""
+Provider Latency Tracking
+Decaying latency histograms used to estimate per-provider percentiles
+"""
+
+import bisect
+from typing import List
+
+# Bucket upper bounds in seconds, roughly log-spaced from 10ms to 30s
+DEFAULT_BUCKETS: List[float] = [
+    0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.75,
+    1.0, 1.5, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 30.0,
+]
+
+class LatencyHistogram:
+    """
+    Bucketed latency histogram whose counts are halved once they reach
+    max_samples, so percentiles follow recent behaviour
+    """
+
+    def __init__(self, buckets: List[float] = DEFAULT_BUCKETS, max_samples: int = 500):
+        self.buckets = buckets
+        self.max_samples = max_samples
+        # One extra bucket for observations above the last bound
+        self.counts = [0.0] * (len(buckets) + 1)
+        self.count = 0.0
+
+    def observe(self, seconds: float):
+        """Record one latency observation"""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        if self.count >= self.max_samples:
+            self.counts = [count / 2 for count in self.counts]
+            self.count /= 2
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile (0-1), interpolating linearly within the bucket"""
+        if not self.count:
+            return 0.0
+
+        target = q * self.count
+        cumulative = 0.0
+        for index, count in enumerate(self.counts):
+            if cumulative + count >= target and count > 0:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (target - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
@@ -8,13 +8,25 @@ import asyncio
 import aiohttp
 import os
 import time
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Dict, Optional, Any, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 import logging
 
+from .circuit_breaker import CircuitBreaker
+from .latency import LatencyHistogram
+from .metrics import PROVIDER_LATENCY, QUOTE_CACHE_EVICTIONS, QUOTE_CACHE_LOOKUPS, QUOTE_CACHE_SYMBOLS
+from .request_timing import note_cache_miss, note_provider_call
+from .rate_limit import ProviderLimiter, RateLimitExceeded
+
 logger = logging.getLogger(__name__)
 
+# Set by _provider_slot once a call has passed its provider's rate and concurrency limits
+_slot_granted: ContextVar[Optional[asyncio.Event]] = ContextVar("provider_slot_granted", default=None)
+
 @dataclass
 class MarketQuote:
     """Market data quote structure"""
@@ -25,31 +37,167 @@ class MarketQuote:
     market_cap: Optional[float] = None
     timestamp: Optional[datetime] = None
     source: Optional[str] = None
+    age_seconds: Optional[float] = None  # Age of the cached data when served
+    is_stale: bool = False  # Served past its TTL while a refresh runs
+
+# Quote fields are cached in groups that change at different rates
+FIELD_GROUPS: Dict[str, Tuple[str, ...]] = {
+    "price": ("price", "change_percent"),
+    "fundamentals": ("sector", "market_cap"),
+}
+
+PRICE_FIELDS: Tuple[str, ...] = FIELD_GROUPS["price"]
+ALL_FIELDS: Tuple[str, ...] = tuple(field_name for fields in FIELD_GROUPS.values() for field_name in fields)
+
+# Providers serving each field group, in merge priority order
+GROUP_PROVIDERS: Dict[str, Tuple[str, ...]] = {
+    "price": ("finnhub", "alpaca"),
+    "fundamentals": ("alphavantage",),
+}
 
 @dataclass
 class CacheEntry:
-    """Cache entry with TTL"""
-    data: MarketQuote
+    """Cache entry for one field group of a symbol, with its own TTL"""
+    values: Dict[str, Any]
+    source: Optional[str]
     timestamp: float
-    ttl: int = 90  # 90 seconds default TTL
+    ttl: int
+    
+    @property
+    def is_empty(self) -> bool:
+        """True when the fetch produced no usable values"""
+        return all(value is None for value in self.values.values())
+    
+    def age(self) -> float:
+        """Seconds since the group was fetched"""
+        return time.time() - self.timestamp
+    
+    def is_valid(self) -> bool:
+        """Check if the group is still within its TTL"""
+        return self.age() < self.ttl
+    
+    def is_servable_stale(self, grace: int) -> bool:
+        """Check if the group is expired but still within the stale grace window"""
+        return self.age() < self.ttl + grace
+
+@dataclass
+class SymbolValidity:
+    """Whether providers recognise a symbol, with backoff for ones they don't"""
+    symbol: str
+    valid: bool = True
+    misses: int = 0
+    last_checked: float = 0.0
+    retry_at: float = 0.0
+
+class QuoteFetch:
+    """One in-flight provider fetch for some field groups of a symbol, merged as results arrive"""
+    
+    def __init__(self, groups: List[str], batch: bool = False):
+        self.groups = groups
+        # Part of a multi-symbol batch, which may leave the symbol out entirely
+        self.batch = batch
+        # field -> (provider rank, value, source) of the best answer so far
+        self.filled: Dict[str, Tuple[int, Any, Optional[str]]] = {}
+        self.done = False
+        self.task: Optional[asyncio.Task] = None
+        self.changed = asyncio.Event()
+    
+    def notify(self):
+        """Wake everyone waiting on this fetch; later waiters get a fresh event"""
+        self.changed.set()
+        self.changed = asyncio.Event()
 
 class MarketDataService:
     """Market data service with caching and multiple providers"""
     
     def __init__(self):
-        self.cache: Dict[str, CacheEntry] = {}
+        # symbol -> field group -> cache entry, least recently used symbol first
+        self.cache: OrderedDict[str, Dict[str, CacheEntry]] = OrderedDict()
+        self.cache_max_symbols = int(os.getenv('QUOTE_CACHE_MAX_SYMBOLS', '5000'))
         self.session: Optional[aiohttp.ClientSession] = None
         
+        # In-flight fetches keyed by (symbol, field group) so concurrent cache misses share one fetch
+        self._inflight: Dict[Tuple[str, str], QuoteFetch] = {}
+        
+        # How often each symbol is requested, used to rank prefetching; bounded with the cache
+        self.request_counts: Counter = Counter()
+        
+        # Called with (symbol, field group) whenever a cache entry is written
+        self.listeners: List[Callable[[str, str], None]] = []
+        
+        # Symbols no price provider recognises are not fetched again until their backoff expires;
+        # records are evicted with the symbol's cache entry
+        self.symbol_validity: Dict[str, SymbolValidity] = {}
+        self.symbol_backoff_base = int(os.getenv('SYMBOL_BACKOFF_BASE', '900'))
+        self.symbol_backoff_max = int(os.getenv('SYMBOL_BACKOFF_MAX', '86400'))
+        
         # API keys from environment
         self.finnhub_key = os.getenv('FINNHUB_API_KEY')
         self.alphavantage_key = os.getenv('ALPHAVANTAGE_API_KEY') 
         self.alpaca_key_id = os.getenv('ALPACA_API_KEY_ID')
         self.alpaca_secret = os.getenv('ALPACA_SECRET_KEY')
         
-        # API endpoints
-        self.finnhub_base = "https://finnhub.io/api/v1"
-        self.alphavantage_base = "https://www.alphavantage.co/query"
-        self.alpaca_base = "https://data.alpaca.markets/v2"
+        # API endpoints, overridable to point at local stand-ins (see benchmarks/)
+        self.finnhub_base = os.getenv('FINNHUB_BASE_URL', "https://finnhub.io/api/v1")
+        self.alphavantage_base = os.getenv('ALPHAVANTAGE_BASE_URL', "https://www.alphavantage.co/query")
+        self.alpaca_base = os.getenv('ALPACA_BASE_URL', "https://data.alpaca.markets/v2")
+        
+        # Symbols per Alpaca multi-symbol snapshot request
+        self.alpaca_batch_size = int(os.getenv('ALPACA_BATCH_SIZE', '200'))
+        
+        # Cache TTLs (seconds) per field group; empty results are retried sooner
+        self.group_ttls = {
+            "price": int(os.getenv('QUOTE_PRICE_TTL', '90')),
+            "fundamentals": int(os.getenv('QUOTE_FUNDAMENTALS_TTL', '86400')),
+        }
+        self.retry_ttl = int(os.getenv('QUOTE_RETRY_TTL', '30'))
+        
+        # Stale-while-revalidate: serve expired groups within the grace window and refresh in background
+        self.serve_stale = os.getenv('QUOTE_SERVE_STALE', 'true').lower() == 'true'
+        self.stale_grace = int(os.getenv('QUOTE_STALE_GRACE', '300'))
+        
+        # Process-wide rate and concurrency limits per provider (requests per minute)
+        max_wait = float(os.getenv('PROVIDER_MAX_WAIT', '5'))
+        latency_threshold = float(os.getenv('PROVIDER_LATENCY_THRESHOLD', '2.0'))
+        self.limiters: Dict[str, ProviderLimiter] = {
+            "finnhub": ProviderLimiter(
+                "Finnhub", float(os.getenv('FINNHUB_RATE_LIMIT', '60')),
+                max_concurrency=10, max_wait=max_wait, latency_threshold=latency_threshold
+            ),
+            "alphavantage": ProviderLimiter(
+                "AlphaVantage", float(os.getenv('ALPHAVANTAGE_RATE_LIMIT', '5')),
+                max_concurrency=2, max_wait=max_wait, latency_threshold=latency_threshold
+            ),
+            "alpaca": ProviderLimiter(
+                "Alpaca", float(os.getenv('ALPACA_RATE_LIMIT', '200')),
+                max_concurrency=10, max_wait=max_wait, latency_threshold=latency_threshold
+            ),
+        }
+        
+        # Circuit breakers let a failing or slow provider be skipped instead of waited on
+        self.breakers: Dict[str, CircuitBreaker] = {
+            provider: CircuitBreaker(
+                limiter.name,
+                window=float(os.getenv('CIRCUIT_WINDOW', '60')),
+                min_calls=int(os.getenv('CIRCUIT_MIN_CALLS', '5')),
+                error_rate_threshold=float(os.getenv('CIRCUIT_ERROR_THRESHOLD', '0.5')),
+                slow_call_seconds=float(os.getenv('CIRCUIT_SLOW_CALL_SECONDS', '5')),
+                open_seconds=float(os.getenv('CIRCUIT_OPEN_SECONDS', '30'))
+            )
+            for provider, limiter in self.limiters.items()
+        }
+        
+        # Latency of successful calls per provider, used to time hedged requests
+        self.latency: Dict[str, LatencyHistogram] = {provider: LatencyHistogram() for provider in self.limiters}
+        
+        # Hedging: if the primary provider of a field group hasn't answered within its
+        # observed latency quantile, the next provider for the group is called as well
+        self.hedging_enabled = os.getenv('HEDGE_ENABLED', 'true').lower() == 'true'
+        self.hedge_quantile = float(os.getenv('HEDGE_QUANTILE', '0.95'))
+        self.hedge_default_delay = float(os.getenv('HEDGE_DEFAULT_DELAY', '0.5'))
+        self.hedge_min_delay = float(os.getenv('HEDGE_MIN_DELAY', '0.05'))
+        self.hedge_max_delay = float(os.getenv('HEDGE_MAX_DELAY', '2.0'))
+        self.hedge_min_samples = 20
     
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create HTTP session"""
@@ -59,34 +207,241 @@ class MarketDataService:
         return self.session
     
     async def close(self):
-        """Close HTTP session"""
+        """Cancel in-flight fetches and close HTTP session"""
+        for fetch in set(self._inflight.values()):
+            if fetch.task is not None:
+                fetch.task.cancel()
+        self._inflight.clear()
+        
         if self.session:
             await self.session.close()
             self.session = None
     
-    def _is_cache_valid(self, symbol: str) -> bool:
-        """Check if cached data is still valid"""
+    def _is_cache_valid(self, symbol: str, group: str) -> bool:
+        """Check if a cached field group is still valid"""
+        entry = self.cache.get(symbol, {}).get(group)
+        return entry is not None and entry.is_valid()
+    
+    def _stale_groups(self, symbol: str) -> List[str]:
+        """Field groups of a symbol that are missing or past their TTL"""
+        return [group for group in FIELD_GROUPS if not self._is_cache_valid(symbol, group)]
+    
+    def expiring_groups(self, symbol: str, within: float) -> List[str]:
+        """Field groups of a symbol that are missing or expire within the given number of seconds"""
+        if self._in_backoff(symbol):
+            return []
+        groups = self.cache.get(symbol, {})
+        return [
+            group for group in FIELD_GROUPS
+            if group not in groups or groups[group].ttl - groups[group].age() < within
+        ]
+    
+    def _within_grace(self, symbol: str, groups: List[str]) -> bool:
+        """Check if every given field group is cached and no older than TTL plus the stale grace window"""
+        cached = self.cache.get(symbol, {})
+        return all(
+            group in cached and cached[group].is_servable_stale(self.stale_grace)
+            for group in groups
+        )
+    
+    def _set_cache(
+        self,
+        symbol: str,
+        group: str,
+        values: Dict[str, Any],
+        source: Optional[str],
+        answered: bool = True
+    ):
+        """
+        Set cache entry for a field group. An empty group the providers failed to
+        answer uses the retry TTL; one they answered (nothing known) keeps the full TTL.
+        """
+        entry = CacheEntry(
+            values=values,
+            source=source,
+            timestamp=time.time(),
+            ttl=self.group_ttls[group]
+        )
+        if entry.is_empty and not answered:
+            entry.ttl = self.retry_ttl
         if symbol not in self.cache:
-            return False
+            self.cache[symbol] = {}
+            self._evict()
+        self.cache[symbol][group] = entry
         
-        cache_entry = self.cache[symbol]
-        age = time.time() - cache_entry.timestamp
-        return age < cache_entry.ttl
+        for listener in self.listeners:
+            try:
+                listener(symbol, group)
+            except Exception as e:
+                logger.error(f"Cache listener failed for {symbol}: {e}")
     
-    def _get_from_cache(self, symbol: str) -> Optional[MarketQuote]:
-        """Get data from cache if valid"""
-        if self._is_cache_valid(symbol):
-            return self.cache[symbol].data
-        return None
+    def _evict(self):
+        """Drop least recently used symbols beyond the cache size limit"""
+        while len(self.cache) > self.cache_max_symbols:
+            symbol, _ = self.cache.popitem(last=False)
+            self.request_counts.pop(symbol, None)
+            # Clients can request arbitrary symbols, so unknown ones must not outlive their cache entry
+            self.symbol_validity.pop(symbol, None)
+            QUOTE_CACHE_EVICTIONS.inc()
+            logger.debug(f"Evicted {symbol} from the quote cache")
+        QUOTE_CACHE_SYMBOLS.set(len(self.cache))
     
-    def _set_cache(self, symbol: str, data: MarketQuote, ttl: int = 90):
-        """Set cache entry with TTL"""
-        self.cache[symbol] = CacheEntry(
-            data=data,
-            timestamp=time.time(),
-            ttl=ttl
+    def _prune_request_counts(self):
+        """Drop counts of symbols that are neither cached nor being fetched (e.g. fetches that were cancelled)"""
+        fetching = {symbol for symbol, _ in self._inflight}
+        for symbol in [symbol for symbol in self.request_counts if symbol not in self.cache and symbol not in fetching]:
+            del self.request_counts[symbol]
+    
+    def add_listener(self, listener: Callable[[str, str], None]):
+        """Register a callback for cache writes; it runs inline, so it must not block"""
+        self.listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable[[str, str], None]):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+    
+    def cached_quote(self, symbol: str) -> Optional[MarketQuote]:
+        """Quote from the cache only (possibly stale), or None if nothing is cached"""
+        if symbol not in self.cache:
+            return None
+        return self._build_quote(symbol)
+    
+    def _in_backoff(self, symbol: str) -> bool:
+        """Check if a symbol is known invalid and its next check is not due yet"""
+        validity = self.symbol_validity.get(symbol)
+        return validity is not None and not validity.valid and time.time() < validity.retry_at
+    
+    def _record_miss(self, symbol: str):
+        """Record that no price provider recognised a symbol, doubling its backoff"""
+        validity = self.symbol_validity.setdefault(symbol, SymbolValidity(symbol=symbol))
+        validity.valid = False
+        validity.misses += 1
+        validity.last_checked = time.time()
+        backoff = min(self.symbol_backoff_base * 2 ** (validity.misses - 1), self.symbol_backoff_max)
+        validity.retry_at = validity.last_checked + backoff
+        logger.info(f"No provider recognises {symbol} (miss {validity.misses}), not fetching again for {backoff}s")
+    
+    def _mark_valid(self, symbol: str):
+        """Clear any invalid record once a provider returns data for a symbol"""
+        validity = self.symbol_validity.get(symbol)
+        if validity is not None and not validity.valid:
+            logger.info(f"{symbol} is recognised again after {validity.misses} miss(es)")
+        self.symbol_validity[symbol] = SymbolValidity(symbol=symbol, last_checked=time.time())
+    
+    def invalid_symbols(self) -> List[SymbolValidity]:
+        """Symbols that no price provider currently recognises"""
+        return sorted(
+            (validity for validity in self.symbol_validity.values() if not validity.valid),
+            key=lambda validity: validity.symbol
         )
     
+    def _build_quote(self, symbol: str) -> MarketQuote:
+        """Assemble a quote from whatever field groups are cached for a symbol"""
+        quote = MarketQuote(symbol=symbol)
+        groups = self.cache.get(symbol, {})
+        for group in FIELD_GROUPS:
+            entry = groups.get(group)
+            if entry is None:
+                continue
+            for field_name, value in entry.values.items():
+                setattr(quote, field_name, value)
+            if not entry.is_valid():
+                quote.is_stale = True
+        
+        # The quote is attributed to (and timestamped by) its price data when available
+        primary = groups.get("price")
+        if primary is None or primary.is_empty:
+            primary = groups.get("fundamentals")
+        if primary is not None:
+            quote.source = primary.source
+            quote.timestamp = datetime.fromtimestamp(primary.timestamp)
+            quote.age_seconds = round(primary.age(), 3)
+        else:
+            quote.timestamp = datetime.now()
+        return quote
+    
+    def _provider_configured(self, provider: str) -> bool:
+        """Check whether a provider has real API credentials"""
+        if provider == "finnhub":
+            return bool(self.finnhub_key) and self.finnhub_key != 'your_finnhub_api_key'
+        if provider == "alphavantage":
+            return bool(self.alphavantage_key) and self.alphavantage_key != 'your_alphavantage_api_key'
+        if provider == "alpaca":
+            return bool(self.alpaca_key_id) and self.alpaca_key_id != 'your_alpaca_key_id'
+        return False
+    
+    @asynccontextmanager
+    async def _provider_slot(self, provider: str):
+        """Wait for the provider's shared rate and concurrency limits, then report the outcome to its breaker"""
+        acquired = False
+        try:
+            async with self.limiters[provider].slot() as permit:
+                acquired = True
+                granted = _slot_granted.get()
+                if granted is not None:
+                    granted.set()
+                start = time.monotonic()
+                try:
+                    yield permit
+                except asyncio.CancelledError:
+                    permit.cancel()
+                    raise
+                except Exception:
+                    permit.fail()
+                    raise
+                finally:
+                    latency = time.monotonic() - start
+                    if permit.cancelled:
+                        # Abandoned calls (hedge losers, timeouts, shutdown) say nothing about the provider
+                        self.breakers[provider].release_probe()
+                    else:
+                        self.breakers[provider].record(latency, ok=not permit.failed)
+                        outcome = "throttled" if permit.throttled else "error" if permit.failed else "ok"
+                        PROVIDER_LATENCY.labels(provider, outcome).observe(latency)
+                        note_provider_call(provider, outcome, latency)
+                        if not permit.failed:
+                            self.latency[provider].observe(latency)
+        finally:
+            if not acquired:
+                # No call was sent (rate limited or cancelled while queued), so a
+                # half-open probe reserved for it must not block the provider
+                self.breakers[provider].release_probe()
+    
+    def provider_status(self) -> Dict[str, Any]:
+        """Configuration, circuit breaker and concurrency state of each provider"""
+        return {
+            provider: {
+                "configured": self._provider_configured(provider),
+                "circuit": self.breakers[provider].snapshot(),
+                "concurrency_limit": limiter.concurrency.current_limit,
+                "in_flight": limiter.concurrency.in_flight,
+                "latency_p50": round(self.latency[provider].quantile(0.5), 3),
+                "latency_p95": round(self.latency[provider].quantile(0.95), 3),
+                "hedge_delay": round(self._hedge_delay(provider), 3),
+            }
+            for provider, limiter in self.limiters.items()
+        }
+    
+    def _hedge_delay(self, provider: str) -> float:
+        """How long to wait for a provider before hedging with the next one"""
+        histogram = self.latency[provider]
+        if histogram.count < self.hedge_min_samples:
+            return self.hedge_default_delay
+        delay = histogram.quantile(self.hedge_quantile)
+        return min(max(delay, self.hedge_min_delay), self.hedge_max_delay)
+    
+    def configured_providers(self, group: str) -> List[str]:
+        """Providers with credentials that serve a field group, in priority order"""
+        return [provider for provider in GROUP_PROVIDERS[group] if self._provider_configured(provider)]
+    
+    def _provider_fetcher(self, provider: str):
+        """Get the single-symbol quote method for a provider"""
+        return {
+            "finnhub": self.get_finnhub_quote,
+            "alphavantage": self.get_alpha_vantage_quote,
+            "alpaca": self.get_alpaca_quote,
+        }[provider]
+    
     async def get_finnhub_quote(self, symbol: str) -> Optional[MarketQuote]:
         """
         Get quote from Finnhub API (primary for price + % change)
@@ -103,7 +458,7 @@ class MarketDataService:
                 'token': self.finnhub_key
             }
             
-            async with session.get(url, params=params) as response:
+            async with self._provider_slot("finnhub") as permit, session.get(url, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
                     
@@ -111,6 +466,10 @@ class MarketDataService:
                     current_price = data.get('c')  # Current price
                     prev_close = data.get('pc')    # Previous close
                     
+                    # Finnhub answers unknown symbols with zeros
+                    if not current_price and not prev_close:
+                        return MarketQuote(symbol=symbol, timestamp=datetime.now(), source="Finnhub")
+                    
                     change_percent = None
                     if current_price and prev_close and prev_close > 0:
                         change_percent = ((current_price - prev_close) / prev_close) * 100
@@ -123,8 +482,14 @@ class MarketDataService:
                         source="Finnhub"
                     )
                 else:
+                    if response.status == 429:
+                        permit.throttle()
+                    else:
+                        permit.fail()
                     logger.error(f"Finnhub API error {response.status} for {symbol}")
                     
+        except RateLimitExceeded as e:
+            logger.warning(f"Skipping Finnhub for {symbol}: {e}")
         except Exception as e:
             logger.error(f"Finnhub API error for {symbol}: {e}")
         
@@ -149,13 +514,17 @@ class MarketDataService:
                 'apikey': self.alphavantage_key
             }
             
-            async with session.get(url, params=params) as response:
+            async with self._provider_slot("alphavantage") as permit, session.get(url, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
                     
                     # Check for API limit or error
-                    if 'Error Message' in data or 'Note' in data:
-                        logger.warning(f"AlphaVantage API limit/error for {symbol}: {data}")
+                    if 'Note' in data or 'Information' in data:
+                        permit.throttle()
+                        logger.warning(f"AlphaVantage API limit for {symbol}: {data}")
+                        return None
+                    if 'Error Message' in data:
+                        logger.warning(f"AlphaVantage API error for {symbol}: {data}")
                         return None
                     
                     # Extract fundamentals
@@ -178,8 +547,14 @@ class MarketDataService:
                         source="AlphaVantage"
                     )
                 else:
+                    if response.status == 429:
+                        permit.throttle()
+                    else:
+                        permit.fail()
                     logger.error(f"AlphaVantage API error {response.status} for {symbol}")
                     
+        except RateLimitExceeded as e:
+            logger.warning(f"Skipping AlphaVantage for {symbol}: {e}")
         except Exception as e:
             logger.error(f"AlphaVantage API error for {symbol}: {e}")
         
@@ -203,7 +578,7 @@ class MarketDataService:
                 'APCA-API-SECRET-KEY': self.alpaca_secret
             }
             
-            async with session.get(url, headers=headers) as response:
+            async with self._provider_slot("alpaca") as permit, session.get(url, headers=headers) as response:
                 if response.status == 200:
                     data = await response.json()
                     bar = data.get('bar', {})
@@ -222,87 +597,496 @@ class MarketDataService:
                         timestamp=datetime.now(),
                         source="Alpaca"
                     )
+                elif response.status in (404, 422):
+                    # Unknown or invalid symbol: an answer, not a provider failure
+                    return MarketQuote(symbol=symbol, timestamp=datetime.now(), source="Alpaca")
                 else:
+                    if response.status == 429:
+                        permit.throttle()
+                    else:
+                        permit.fail()
                     logger.error(f"Alpaca API error {response.status} for {symbol}")
                     
+        except RateLimitExceeded as e:
+            logger.warning(f"Skipping Alpaca for {symbol}: {e}")
         except Exception as e:
             logger.error(f"Alpaca API error for {symbol}: {e}")
         
         return None
     
-    async def get_enriched_quote(self, symbol: str) -> MarketQuote:
+    async def get_alpaca_snapshots(self, symbols: List[str]) -> Dict[str, MarketQuote]:
+        """
+        Get prices for many symbols in one request from Alpaca's multi-symbol snapshots
+        (latest trade vs. previous daily close)
+        """
+        quotes: Dict[str, MarketQuote] = {}
+        if not self.alpaca_key_id or self.alpaca_key_id == 'your_alpaca_key_id':
+            logger.warning("Alpaca API key not configured")
+            return quotes
+        
+        try:
+            session = await self._get_session()
+            
+            url = f"{self.alpaca_base}/stocks/snapshots"
+            params = {'symbols': ','.join(symbols)}
+            headers = {
+                'APCA-API-KEY-ID': self.alpaca_key_id,
+                'APCA-API-SECRET-KEY': self.alpaca_secret
+            }
+            
+            async with self._provider_slot("alpaca") as permit, session.get(url, params=params, headers=headers) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    
+                    # Symbols Alpaca doesn't know are missing or null
+                    for symbol, snapshot in data.items():
+                        if not snapshot:
+                            continue
+                        trade = snapshot.get('latestTrade') or {}
+                        daily_bar = snapshot.get('dailyBar') or {}
+                        prev_bar = snapshot.get('prevDailyBar') or {}
+                        
+                        current_price = trade.get('p') or daily_bar.get('c')
+                        prev_close = prev_bar.get('c')
+                        
+                        change_percent = None
+                        if current_price and prev_close and prev_close > 0:
+                            change_percent = ((current_price - prev_close) / prev_close) * 100
+                        
+                        quotes[symbol] = MarketQuote(
+                            symbol=symbol,
+                            price=current_price,
+                            change_percent=change_percent,
+                            timestamp=datetime.now(),
+                            source="Alpaca"
+                        )
+                else:
+                    if response.status == 429:
+                        permit.throttle()
+                    else:
+                        permit.fail()
+                    logger.error(f"Alpaca snapshots API error {response.status} for {len(symbols)} symbols")
+                    
+        except RateLimitExceeded as e:
+            logger.warning(f"Skipping Alpaca snapshots for {len(symbols)} symbols: {e}")
+        except Exception as e:
+            logger.error(f"Alpaca snapshots API error for {len(symbols)} symbols: {e}")
+        
+        return quotes
+    
+    async def get_enriched_quote(
+        self,
+        symbol: str,
+        allow_stale: bool = True,
+        required_fields: Optional[Tuple[str, ...]] = None,
+        timeout: float = 15.0,
+        refresh_optional: bool = True
+    ) -> MarketQuote:
         """
         Get enriched market data with fallbacks and caching
         Priority: Finnhub (price) + AlphaVantage (fundamentals) + Alpaca (fallback)
+        
+        Concurrent cache misses for the same symbol are coalesced into a single
+        provider fetch that every caller awaits. Expired data within the stale
+        grace window is returned immediately (marked stale) while it is refreshed
+        in the background.
+        
+        Provider results are merged as they arrive, so the call returns as soon as
+        the required fields (all fields by default) are filled or the timeout
+        passes; slower providers keep updating the cache in the background.
+        
+        With refresh_optional=False, expired groups holding no required field are
+        left to the prefetch scheduler instead of being fetched.
         """
-        # Check cache first
-        cached = self._get_from_cache(symbol)
-        if cached:
+        if symbol in self.cache:
+            self.cache.move_to_end(symbol)
+        elif len(self.request_counts) >= 2 * self.cache_max_symbols:
+            self._prune_request_counts()
+        self.request_counts[symbol] += 1
+        
+        # Symbols no provider recognises cost nothing until their next check is due
+        if self._in_backoff(symbol):
+            QUOTE_CACHE_LOOKUPS.labels("backoff").inc()
+            return self._build_quote(symbol)
+        
+        stale_groups = self._stale_groups(symbol)
+        if not stale_groups:
+            QUOTE_CACHE_LOOKUPS.labels("hit").inc()
             logger.debug(f"Using cached data for {symbol}")
-            return cached
+            return self._build_quote(symbol)
+        
+        # Stale groups are refreshed, but only the required ones are waited on
+        required = required_fields or ALL_FIELDS
+        required_groups = [
+            group for group in stale_groups
+            if any(field_name in required for field_name in FIELD_GROUPS[group])
+        ]
+        fetches = self._start_fetches(symbol, stale_groups if refresh_optional else required_groups)
+        if not required_groups:
+            QUOTE_CACHE_LOOKUPS.labels("hit").inc()
+            return self._build_quote(symbol)
         
-        # Initialize result quote
-        quote = MarketQuote(symbol=symbol, timestamp=datetime.now())
+        if allow_stale and self.serve_stale and self._within_grace(symbol, required_groups):
+            QUOTE_CACHE_LOOKUPS.labels("stale").inc()
+            quote = self._build_quote(symbol)
+            logger.debug(f"Serving stale data for {symbol} ({quote.age_seconds}s old), refreshing in background")
+            return quote
         
-        # Fetch from multiple sources concurrently
-        tasks = []
-        if self.finnhub_key and self.finnhub_key != 'your_finnhub_api_key':
-            tasks.append(self.get_finnhub_quote(symbol))
-        if self.alphavantage_key and self.alphavantage_key != 'your_alphavantage_api_key':
-            tasks.append(self.get_alpha_vantage_quote(symbol))
-        if self.alpaca_key_id and self.alpaca_key_id != 'your_alpaca_key_id':
-            tasks.append(self.get_alpaca_quote(symbol))
+        QUOTE_CACHE_LOOKUPS.labels("miss").inc()
+        note_cache_miss(symbol)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        await self._await_fields(symbol, fetches, required, timeout)
         
-        if tasks:
+        # A batch that left the symbol out answered nothing for it; fall back to the per-symbol providers
+        unanswered = [
+            group for fetch in fetches if fetch.batch and fetch.done and not fetch.filled
+            for group in fetch.groups
+        ]
+        if unanswered and loop.time() < deadline:
+            fetches = self._start_fetches(symbol, unanswered)
+            await self._await_fields(symbol, fetches, required, deadline - loop.time())
+        return self._build_quote(symbol)
+    
+    async def refresh_quote(self, symbol: str, groups: Optional[List[str]] = None) -> MarketQuote:
+        """Refresh field groups of a symbol ahead of expiry (all groups by default)"""
+        fetches = self._start_fetches(symbol, groups or list(FIELD_GROUPS))
+        await asyncio.gather(*(asyncio.shield(fetch.task) for fetch in fetches), return_exceptions=True)
+        return self._build_quote(symbol)
+    
+    def _start_fetches(self, symbol: str, groups: List[str]) -> List[QuoteFetch]:
+        """Join in-flight fetches for the given field groups and start one fetch for the rest"""
+        fetches: List[QuoteFetch] = []
+        missing: List[str] = []
+        for group in groups:
+            fetch = self._inflight.get((symbol, group))
+            if fetch is None:
+                missing.append(group)
+            elif fetch not in fetches:
+                logger.debug(f"Joining in-flight {group} fetch for {symbol}")
+                fetches.append(fetch)
+        
+        if missing:
+            fetch = QuoteFetch(missing)
+            for group in missing:
+                self._inflight[(symbol, group)] = fetch
+            fetch.task = asyncio.ensure_future(self._fetch_enriched_quote(symbol, fetch))
+            fetch.task.add_done_callback(lambda done: self._clear_inflight(symbol, fetch, done))
+            fetches.append(fetch)
+        return fetches
+    
+    def _clear_inflight(self, symbol: str, fetch: QuoteFetch, task: asyncio.Future):
+        """Remove a finished fetch from the in-flight registry"""
+        for group in fetch.groups:
+            if self._inflight.get((symbol, group)) is fetch:
+                del self._inflight[(symbol, group)]
+        
+        # Background refreshes have no awaiting caller, so surface their errors here
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error refreshing market data for {symbol}: {task.exception()}")
+    
+    def _fields_settled(self, symbol: str, fetches: List[QuoteFetch], required: Tuple[str, ...]) -> bool:
+        """Check if every required field is cached, or no pending fetch could still provide it"""
+        pending_groups = {group for fetch in fetches if not fetch.done for group in fetch.groups}
+        cached = self.cache.get(symbol, {})
+        for group, fields in FIELD_GROUPS.items():
+            if group not in pending_groups:
+                continue
+            entry = cached.get(group)
+            for field_name in fields:
+                if field_name not in required:
+                    continue
+                if entry is None or not entry.is_valid() or entry.values.get(field_name) is None:
+                    return False
+        return True
+    
+    async def _await_fields(
+        self,
+        symbol: str,
+        fetches: List[QuoteFetch],
+        required: Tuple[str, ...],
+        timeout: float
+    ):
+        """Wait until the required fields are filled, the fetches finish, or the timeout passes"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not self._fields_settled(symbol, fetches, required):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                logger.warning(f"Timeout waiting for market data for {symbol}")
+                return
+            
+            waiters = [asyncio.ensure_future(fetch.changed.wait()) for fetch in fetches if not fetch.done]
             try:
-                # Wait for all API calls with timeout
-                results = await asyncio.wait_for(
-                    asyncio.gather(*tasks, return_exceptions=True),
-                    timeout=15.0
-                )
+                await asyncio.wait(waiters, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+    
+    def _merge_result(self, symbol: str, fetch: QuoteFetch, provider: str, result: MarketQuote):
+        """Merge one provider result into the fetch and cache, following per-field provider priority"""
+        for group in fetch.groups:
+            if provider not in GROUP_PROVIDERS[group]:
+                continue
+            rank = GROUP_PROVIDERS[group].index(provider)
+            
+            updated = False
+            for field_name in FIELD_GROUPS[group]:
+                value = getattr(result, field_name)
+                if value is None or value == "":
+                    continue
+                current = fetch.filled.get(field_name)
+                if current is None or rank < current[0]:
+                    fetch.filled[field_name] = (rank, value, result.source)
+                    updated = True
+            
+            if updated:
+                filled = [fetch.filled[field_name] for field_name in FIELD_GROUPS[group] if field_name in fetch.filled]
+                values = {
+                    field_name: fetch.filled[field_name][1] if field_name in fetch.filled else None
+                    for field_name in FIELD_GROUPS[group]
+                }
+                source = min(filled, key=lambda answer: answer[0])[2]
+                self._set_cache(symbol, group, values, source)
+    
+    def _start_call(self, call: Awaitable[Optional[MarketQuote]]) -> Tuple[asyncio.Future, asyncio.Event]:
+        """Start a provider call as a task, with an event set once it gets its provider slot"""
+        granted = asyncio.Event()
+        token = _slot_granted.set(granted)
+        try:
+            # The task copies the current context, event included
+            task = asyncio.ensure_future(call)
+        finally:
+            _slot_granted.reset(token)
+        return task, granted
+    
+    async def _hedged_call(
+        self,
+        provider: str,
+        symbol: str,
+        group: str,
+        primary_provider: str,
+        primary: asyncio.Future,
+        primary_granted: asyncio.Event
+    ) -> Optional[MarketQuote]:
+        """
+        Call a fallback provider only if the primary hasn't delivered the group within
+        its hedge delay. The delay starts once the primary has its provider slot: the
+        latency histogram excludes queueing, and hedging a call that is only waiting on
+        its own rate limit would double provider load exactly when it is scarcest.
+        """
+        granted = asyncio.ensure_future(primary_granted.wait())
+        try:
+            await asyncio.wait([primary, granted], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            granted.cancel()
+        
+        delay = self._hedge_delay(primary_provider)
+        await asyncio.wait([primary], timeout=delay)
+        
+        if primary.done() and not primary.cancelled() and primary.exception() is None:
+            result = primary.result()
+            if isinstance(result, MarketQuote) and any(
+                getattr(result, field_name) is not None for field_name in FIELD_GROUPS[group]
+            ):
+                return None
+        
+        if not self.breakers[provider].allow_request():
+            return None
+        logger.debug(f"Hedging {group} for {symbol}: {primary_provider} gave no answer within {delay:.2f}s, calling {provider}")
+        return await self._provider_fetcher(provider)(symbol)
+    
+    async def _fetch_enriched_quote(self, symbol: str, fetch: QuoteFetch) -> MarketQuote:
+        """Fetch the field groups of a symbol from their providers, caching each result as it arrives"""
+        # Each group calls its first available provider right away; the rest are hedges
+        # (or plain concurrent calls when hedging is disabled)
+        tasks: Dict[asyncio.Future, str] = {}
+        started: Dict[str, asyncio.Future] = {}
+        granted: Dict[str, asyncio.Event] = {}
+        for group in fetch.groups:
+            primary_provider = None
+            for provider in self.configured_providers(group):
+                if provider in started:
+                    primary_provider = primary_provider or provider
+                    continue
                 
-                # Merge results with priority
-                for result in results:
-                    if isinstance(result, MarketQuote):
-                        # Price data priority: Finnhub > Alpaca
-                        if result.price is not None and quote.price is None:
-                            quote.price = result.price
-                            quote.source = result.source
-                        
-                        # Change percent priority: Finnhub > Alpaca  
-                        if result.change_percent is not None and quote.change_percent is None:
-                            quote.change_percent = result.change_percent
-                        
-                        # Fundamentals priority: AlphaVantage > Alpaca
-                        if result.sector and not quote.sector:
-                            quote.sector = result.sector
-                        
-                        if result.market_cap is not None and quote.market_cap is None:
-                            quote.market_cap = result.market_cap
+                if primary_provider is not None and self.hedging_enabled:
+                    task, granted[provider] = self._start_call(self._hedged_call(
+                        provider, symbol, group, primary_provider,
+                        started[primary_provider], granted[primary_provider]
+                    ))
+                elif self.breakers[provider].allow_request():
+                    task, granted[provider] = self._start_call(self._provider_fetcher(provider)(symbol))
+                else:
+                    continue
                 
-            except asyncio.TimeoutError:
-                logger.warning(f"Timeout fetching market data for {symbol}")
-            except Exception as e:
-                logger.error(f"Error fetching market data for {symbol}: {e}")
+                primary_provider = primary_provider or provider
+                started[provider] = task
+                tasks[task] = provider
         
-        # Cache the result (even if partial)
-        self._set_cache(symbol, quote)
+        pending = set(tasks)
+        answered = set()
+        try:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + 15.0
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=deadline - loop.time(),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    logger.warning(f"Timeout fetching market data for {symbol}")
+                    break
+                
+                for task in done:
+                    if task.exception() is not None:
+                        logger.error(f"Error fetching market data for {symbol}: {task.exception()}")
+                    elif isinstance(task.result(), MarketQuote):
+                        answered.add(tasks[task])
+                        self._merge_result(symbol, fetch, tasks[task], task.result())
+                fetch.notify()
+        finally:
+            for task in pending:
+                task.cancel()
+            
+            # Empty groups are negatively cached: with the full TTL when a provider answered
+            # that it knows nothing, with the short retry TTL (unless older data can still be
+            # served stale) when no provider answered at all
+            for group in fetch.groups:
+                if any(field_name in fetch.filled for field_name in FIELD_GROUPS[group]):
+                    continue
+                group_answered = any(provider in answered for provider in GROUP_PROVIDERS[group])
+                if not group_answered and self._within_grace(symbol, [group]) and not self.cache[symbol][group].is_empty:
+                    continue
+                self._set_cache(
+                    symbol, group, {field_name: None for field_name in FIELD_GROUPS[group]}, None,
+                    answered=group_answered
+                )
+            
+            # Validity follows the price providers: a price means the symbol is live,
+            # only "unknown" answers and no price means it is invalid or delisted
+            if "price" in fetch.groups:
+                if any(field_name in fetch.filled for field_name in FIELD_GROUPS["price"]):
+                    self._mark_valid(symbol)
+                elif any(provider in answered for provider in GROUP_PROVIDERS["price"]):
+                    self._record_miss(symbol)
+            fetch.done = True
+            fetch.notify()
         
-        return quote
+        return self._build_quote(symbol)
+    
+    def _start_price_batch(self, symbols: List[str]) -> Optional[asyncio.Future]:
+        """
+        Refresh prices for many symbols through Alpaca's batch endpoint, registering
+        a price fetch per symbol so concurrent callers join it
+        """
+        symbols = [
+            symbol for symbol in symbols
+            if (symbol, "price") not in self._inflight and not self._in_backoff(symbol)
+        ]
+        if not symbols or not self._provider_configured("alpaca") or not self.breakers["alpaca"].allow_request():
+            return None
+        
+        fetches = {symbol: QuoteFetch(["price"], batch=True) for symbol in symbols}
+        task = asyncio.ensure_future(self._fetch_price_batch(fetches))
+        for symbol, fetch in fetches.items():
+            fetch.task = task
+            self._inflight[(symbol, "price")] = fetch
+        return task
+    
+    async def _fetch_price_batch(self, fetches: Dict[str, QuoteFetch]):
+        """Fetch prices in chunks of alpaca_batch_size and split them into per-symbol cache entries"""
+        symbols = list(fetches)
+        chunks = [
+            symbols[start:start + self.alpaca_batch_size]
+            for start in range(0, len(symbols), self.alpaca_batch_size)
+        ]
+        try:
+            for next_chunk in asyncio.as_completed([self.get_alpaca_snapshots(chunk) for chunk in chunks]):
+                quotes = await next_chunk
+                for symbol, quote in quotes.items():
+                    if symbol in fetches:
+                        self._merge_result(symbol, fetches[symbol], "alpaca", quote)
+                        if quote.price is not None:
+                            self._mark_valid(symbol)
+                        fetches[symbol].notify()
+        finally:
+            # Symbols Alpaca didn't answer for are left to the per-symbol path, not cached empty
+            for symbol, fetch in fetches.items():
+                fetch.done = True
+                fetch.notify()
+                if self._inflight.get((symbol, "price")) is fetch:
+                    del self._inflight[(symbol, "price")]
+        
+        logger.info(f"Fetched {len(symbols)} prices from Alpaca in {len(chunks)} batch request(s)")
+    
+    def supports_price_batch(self) -> bool:
+        """Check whether prices can be fetched for many symbols per request"""
+        return self._provider_configured("alpaca")
+    
+    async def refresh_prices(self, symbols: List[str]):
+        """Refresh prices for many symbols with as few provider requests as possible"""
+        task = self._start_price_batch(symbols)
+        if task is not None:
+            await asyncio.shield(task)
+    
+    def refresh_in_background(self, symbols: List[str], required_fields: Optional[Tuple[str, ...]] = None) -> int:
+        """
+        Start fetching the expired field groups of the symbols that hold a required
+        field (all by default) without waiting, returning how many symbols need a
+        refresh. Prices are batched when possible.
+        """
+        required = required_fields or ALL_FIELDS
+        stale = {
+            symbol: [
+                group for group in self._stale_groups(symbol)
+                if any(field_name in required for field_name in FIELD_GROUPS[group])
+            ]
+            for symbol in symbols
+            if not self._in_backoff(symbol)
+        }
+        stale = {symbol: groups for symbol, groups in stale.items() if groups}
+        
+        expired_prices = [symbol for symbol, groups in stale.items() if "price" in groups]
+        if len(expired_prices) > 1:
+            self._start_price_batch(expired_prices)
+        
+        # Fetches are held by the in-flight registry; groups already in flight are joined
+        for symbol, groups in stale.items():
+            self._start_fetches(symbol, groups)
+        return len(stale)
     
-    async def get_multiple_quotes(self, symbols: list) -> Dict[str, MarketQuote]:
+    async def get_multiple_quotes(
+        self,
+        symbols: list,
+        required_fields: Optional[Tuple[str, ...]] = None
+    ) -> Dict[str, MarketQuote]:
         """Get quotes for multiple symbols concurrently"""
         if not symbols:
             return {}
         
-        # Limit concurrent requests to avoid overwhelming APIs
-        semaphore = asyncio.Semaphore(5)  # Max 5 concurrent requests
+        # Expired prices are fetched in batch first; only symbols the batch can't
+        # answer fall back to per-symbol provider calls
+        expired = [
+            symbol for symbol in symbols
+            if not self._is_cache_valid(symbol, "price") and not self._in_backoff(symbol)
+        ]
+        if len(expired) > 1:
+            batch = self._start_price_batch(expired)
+            must_wait = not self.serve_stale or not all(self._within_grace(symbol, ["price"]) for symbol in expired)
+            if batch is not None and must_wait:
+                await asyncio.wait([batch], timeout=15.0)
         
-        async def get_quote_with_semaphore(symbol):
-            async with semaphore:
-                return symbol, await self.get_enriched_quote(symbol)
+        # Provider calls are throttled by the shared per-provider limiters, not per request.
+        # Groups the caller doesn't need are not fetched: a page of symbols would otherwise
+        # queue one call each on slow providers (AlphaVantage allows 5 a minute)
+        async def get_quote(symbol):
+            return symbol, await self.get_enriched_quote(
+                symbol, required_fields=required_fields, refresh_optional=False
+            )
         
-        tasks = [get_quote_with_semaphore(symbol) for symbol in symbols]
+        tasks = [get_quote(symbol) for symbol in symbols]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
         quotes = {}
@@ -0,0 +1,104 @@
+"""
+Prometheus Metrics
+Provider latency, quote cache efficiency, database pool and route latency metrics
+"""
+
+import time
+from typing import Callable, Dict, Iterator, Type
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, REGISTRY, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import Pool
+
+from .latency import DEFAULT_BUCKETS
+
+# Provider calls, timed once the rate and concurrency limits let them through
+PROVIDER_LATENCY = Histogram(
+    "aiia_provider_request_seconds",
+    "Latency of market data provider requests",
+    ["provider", "outcome"],
+    buckets=DEFAULT_BUCKETS
+)
+
+# One lookup per get_enriched_quote call: hit, stale (served past TTL), miss (waited on
+# providers) or backoff (symbol known invalid, not fetched)
+QUOTE_CACHE_LOOKUPS = Counter(
+    "aiia_quote_cache_lookups_total",
+    "Quote cache lookups by result",
+    ["result"]
+)
+QUOTE_CACHE_EVICTIONS = Counter(
+    "aiia_quote_cache_evictions_total",
+    "Symbols evicted from the quote cache to stay within its size limit"
+)
+QUOTE_CACHE_SYMBOLS = Gauge(
+    "aiia_quote_cache_symbols",
+    "Symbols currently held in the quote cache"
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "aiia_db_pool_checkout_seconds",
+    "Time to get a connection from the pool, including any wait for a free one",
+    ["pool"],
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+)
+
+ROUTE_LATENCY = Histogram(
+    "aiia_http_request_seconds",
+    "Latency of API requests by route template",
+    ["method", "route", "status"],
+    buckets=DEFAULT_BUCKETS
+)
+
+def metered_pool(url: str, name: str) -> Type[Pool]:
+    """The dialect's default pool class for url, recording checkout time under the given pool label"""
+    parsed = make_url(url)
+    base = parsed.get_dialect().get_pool_class(parsed)
+
+    class MeteredPool(base):
+        def _do_get(self):
+            start = time.monotonic()
+            try:
+                return super()._do_get()
+            finally:
+                DB_POOL_CHECKOUT_WAIT.labels(name).observe(time.monotonic() - start)
+
+    MeteredPool.__name__ = f"Metered{base.__name__}"
+    return MeteredPool
+
+class PoolUsageCollector(Collector):
+    """Reads pool sizes and checked-out connections at scrape time"""
+
+    def __init__(self):
+        self.pools: Dict[str, Callable[[], Pool]] = {}
+
+    def register(self, name: str, get_pool: Callable[[], Pool]):
+        # A callable, since dispose() replaces an engine's pool
+        self.pools[name] = get_pool
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        size = GaugeMetricFamily("aiia_db_pool_size", "Configured pool size", labels=["pool"])
+        checked_out = GaugeMetricFamily("aiia_db_pool_checked_out", "Connections in use", labels=["pool"])
+        overflow = GaugeMetricFamily("aiia_db_pool_overflow", "Connections open beyond the pool size", labels=["pool"])
+        for name, get_pool in self.pools.items():
+            pool = get_pool()
+            # Only queue pools keep these counts
+            if not hasattr(pool, "checkedout"):
+                continue
+            size.add_metric([name], pool.size())
+            checked_out.add_metric([name], pool.checkedout())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+        yield size
+        yield checked_out
+        yield overflow
+
+pool_usage = PoolUsageCollector()
+REGISTRY.register(pool_usage)
+
+def render_metrics() -> bytes:
+    """Current metrics in the Prometheus text format"""
+    return generate_latest(REGISTRY)
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
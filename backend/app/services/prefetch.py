@@ -0,0 +1,135 @@
+"""
+Quote Prefetch Scheduler
+Keeps the market data cache warm for active and watchlisted securities
+"""
+
+import asyncio
+import os
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, union
+
+from ..database import AsyncSessionLocal
+from ..models import Security, WatchlistItem
+from .market_data import MarketDataService
+from .quote_stream import QuoteBroadcaster
+
+logger = logging.getLogger(__name__)
+
+class PrefetchScheduler:
+    """Periodically refreshes the working set of symbols before their cache entries expire"""
+    
+    def __init__(self, market_service: MarketDataService, quote_broadcaster: Optional[QuoteBroadcaster] = None):
+        self.market_service = market_service
+        self.quote_broadcaster = quote_broadcaster
+        self.task: Optional[asyncio.Task] = None
+        
+        # Seconds between cycles, and how far ahead of expiry a group is refreshed
+        self.interval = int(os.getenv('PREFETCH_INTERVAL', '30'))
+        self.lead_time = int(os.getenv('PREFETCH_LEAD_TIME', '45'))
+        
+        # Maximum provider requests the scheduler may spend per cycle
+        self.budgets: Dict[str, int] = {
+            "finnhub": int(os.getenv('PREFETCH_BUDGET_FINNHUB', '20')),
+            "alphavantage": int(os.getenv('PREFETCH_BUDGET_ALPHAVANTAGE', '1')),
+            "alpaca": int(os.getenv('PREFETCH_BUDGET_ALPACA', '50')),
+        }
+    
+    async def start(self):
+        """Start the background prefetch loop"""
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the background prefetch loop"""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+    
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Quote prefetch cycle failed: {e}")
+            await asyncio.sleep(self.interval)
+    
+    async def _load_working_set(self) -> List[str]:
+        """Active securities, every watchlisted symbol and symbols being streamed"""
+        async with AsyncSessionLocal() as db:
+            query = union(
+                select(Security.symbol).where(Security.is_active == True),
+                select(WatchlistItem.symbol)
+            )
+            symbols = set((await db.execute(query)).scalars().all())
+        if self.quote_broadcaster is not None:
+            symbols.update(self.quote_broadcaster.symbols())
+        return list(symbols)
+    
+    def _rank(self, symbols: List[str]) -> List[str]:
+        """Order symbols by how often they have been requested recently"""
+        counts = self.market_service.request_counts
+        ranked = sorted(symbols, key=lambda symbol: (-counts[symbol], symbol))
+        
+        # Decay counts so the ranking follows recent demand
+        for symbol in list(counts):
+            counts[symbol] //= 2
+            if not counts[symbol]:
+                del counts[symbol]
+        return ranked
+    
+    async def run_once(self) -> int:
+        """Run one prefetch cycle, returning the number of symbols refreshed"""
+        symbols = await self._load_working_set()
+        budgets = dict(self.budgets)
+        
+        # Prices go through the provider batch endpoint when available: one request per batch
+        batch_prices = self.market_service.supports_price_batch()
+        batch_size = self.market_service.alpaca_batch_size
+        price_batch: List[str] = []
+        
+        refreshes = []
+        for symbol in self._rank(symbols):
+            groups = []
+            for group in self.market_service.expiring_groups(symbol, self.lead_time):
+                if group == "price" and batch_prices:
+                    if len(price_batch) % batch_size == 0:
+                        if budgets["alpaca"] <= 0:
+                            continue
+                        budgets["alpaca"] -= 1
+                    price_batch.append(symbol)
+                    continue
+                
+                providers = self.market_service.configured_providers(group)
+                if not providers or any(budgets[provider] <= 0 for provider in providers):
+                    continue
+                for provider in providers:
+                    budgets[provider] -= 1
+                groups.append(group)
+            
+            if groups:
+                refreshes.append((symbol, groups))
+            if all(budget <= 0 for budget in budgets.values()):
+                break
+        
+        # Provider concurrency is bounded by the service's shared limiters
+        results = await asyncio.gather(
+            self.market_service.refresh_prices(price_batch),
+            *(self.market_service.refresh_quote(symbol, groups) for symbol, groups in refreshes),
+            return_exceptions=True
+        )
+        if isinstance(results[0], Exception):
+            logger.error(f"Error prefetching prices for {len(price_batch)} symbols: {results[0]}")
+        for (symbol, _), result in zip(refreshes, results[1:]):
+            if isinstance(result, Exception):
+                logger.error(f"Error prefetching {symbol}: {result}")
+        
+        refreshed = len(set(price_batch) | {symbol for symbol, _ in refreshes})
+        if refreshed:
+            logger.info(f"Prefetched market data for {refreshed} of {len(symbols)} symbols")
+        return refreshed
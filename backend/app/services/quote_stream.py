@@ -0,0 +1,147 @@
+"""
+Live Quote Stream
+Fans market data cache updates out to streaming clients, coalescing updates per client
+"""
+
+import asyncio
+import os
+from typing import Dict, Iterable, List, Optional, Set
+import logging
+
+from .market_data import MarketDataService, market_data_service
+
+logger = logging.getLogger(__name__)
+
+class QuoteSubscription:
+    """One client's symbols and the ones updated since it last read"""
+
+    def __init__(self, symbols: Set[str]):
+        self.symbols = symbols
+        self.pending: Set[str] = set()
+        self.ready = asyncio.Event()
+
+    def notify(self, symbol: str):
+        self.pending.add(symbol)
+        self.ready.set()
+
+    async def next_updates(self, timeout: float) -> List[str]:
+        """
+        Wait for updated symbols (empty list on timeout). A symbol updated several
+        times while the client was busy is returned once, so a slow client only
+        ever gets the latest values.
+        """
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return []
+        self.ready.clear()
+        updated, self.pending = self.pending, set()
+        return sorted(updated)
+
+class QuoteBroadcaster:
+    """
+    Single producer for every streaming client: listens to market data cache writes
+    and keeps the prices of subscribed symbols fresher than the regular cache TTL
+    """
+
+    def __init__(self, market_service: MarketDataService):
+        self.market_service = market_service
+        self.subscriptions: Dict[str, Set[QuoteSubscription]] = {}
+        self.task: Optional[asyncio.Task] = None
+        # Created on start so it belongs to the running event loop
+        self._wake: Optional[asyncio.Event] = None
+
+        # Seconds between price refreshes of streamed symbols, and keepalive interval
+        self.refresh_interval = float(os.getenv('STREAM_REFRESH_INTERVAL', '15'))
+        self.heartbeat = float(os.getenv('STREAM_HEARTBEAT', '15'))
+        self.max_symbols = int(os.getenv('STREAM_MAX_SYMBOLS', '200'))
+
+    async def start(self):
+        """Start listening to the cache and refreshing streamed symbols"""
+        if self.task is None:
+            self._wake = asyncio.Event()
+            self.market_service.add_listener(self._on_cache_write)
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the refresh loop"""
+        if self.task is not None:
+            self.market_service.remove_listener(self._on_cache_write)
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def _on_cache_write(self, symbol: str, group: str):
+        for subscription in self.subscriptions.get(symbol, ()):
+            subscription.notify(symbol)
+
+    def subscribe(self, symbols: Iterable[str]) -> QuoteSubscription:
+        """Subscribe to symbols; their prices are refreshed right away if due"""
+        subscription = QuoteSubscription(set(symbols))
+        for symbol in subscription.symbols:
+            self.subscriptions.setdefault(symbol, set()).add(subscription)
+        if self._wake is not None:
+            self._wake.set()
+        return subscription
+
+    def unsubscribe(self, subscription: QuoteSubscription):
+        for symbol in subscription.symbols:
+            subscribers = self.subscriptions.get(symbol)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.subscriptions[symbol]
+
+    def symbols(self) -> List[str]:
+        """Symbols with at least one streaming client"""
+        return list(self.subscriptions)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh_once()
+            except Exception as e:
+                logger.error(f"Quote stream refresh failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def refresh_once(self) -> int:
+        """Refresh prices of streamed symbols older than the refresh interval"""
+        within = self.market_service.group_ttls["price"] - self.refresh_interval
+        due = [
+            symbol for symbol in self.symbols()
+            if "price" in self.market_service.expiring_groups(symbol, within)
+        ]
+        if not due:
+            return 0
+
+        # Writes to the cache reach subscribers through the cache listener
+        if self.market_service.supports_price_batch():
+            await self.market_service.refresh_prices(due)
+        else:
+            results = await asyncio.gather(
+                *(self.market_service.refresh_quote(symbol, ["price"]) for symbol in due),
+                return_exceptions=True
+            )
+            for symbol, result in zip(due, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error refreshing streamed quote for {symbol}: {result}")
+        return len(due)
+
+# Global broadcaster instance
+quote_broadcaster = QuoteBroadcaster(market_data_service)
+
+async def get_quote_broadcaster() -> QuoteBroadcaster:
+    """Get quote broadcaster instance"""
+    return quote_broadcaster
+
+async def cleanup_quote_broadcaster():
+    """Stop the broadcaster on shutdown"""
+    await quote_broadcaster.stop()
@@ -0,0 +1,206 @@
+"""
+Provider Rate Limiting
+Process-wide token buckets and adaptive (AIMD) concurrency limits per market data provider
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RateLimitExceeded(Exception):
+    """Raised when a provider slot can't be obtained within the allowed wait"""
+
+    def __init__(self, provider: str):
+        super().__init__(f"{provider} rate limit reached")
+        self.provider = provider
+
+# Smallest default burst, so low-rate providers (AlphaVantage's 5/min) can serve a few calls at once
+MIN_BURST = 3
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate"""
+
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(MIN_BURST, int(rate_per_minute // 6)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @property
+    def interval(self) -> float:
+        """Seconds to refill one token"""
+        return 1.0 / self.rate
+
+    async def acquire(self, max_wait: float) -> bool:
+        """
+        Reserve one token, sleeping until it is available.
+        Returns False without reserving if that would take longer than max_wait,
+        or than one refill interval for buckets slower than that.
+        """
+        self._refill()
+        wait = max(0.0, (1.0 - self.tokens) / self.rate)
+        if wait > max(max_wait, self.interval):
+            return False
+
+        # Tokens may go negative: later callers queue behind earlier reservations
+        self.tokens -= 1.0
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.release()
+                raise
+        return True
+
+    def release(self):
+        """Return a reserved token that was not used for a call"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + 1.0)
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit: grows additively while calls are healthy and
+    is cut multiplicatively on throttling responses or latency spikes
+    """
+
+    def __init__(
+        self,
+        initial: int = 5,
+        min_limit: int = 1,
+        max_limit: int = 20,
+        latency_threshold: float = 2.0,
+        backoff: float = 0.5,
+        cooldown: float = 1.0
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_threshold = latency_threshold
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        # Created on first use so it belongs to the running event loop; the limiter
+        # itself is built at import time with the module-level market data service
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def current_limit(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def _get_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+        return self._condition
+
+    async def acquire(self):
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < self.current_limit)
+            self.in_flight += 1
+
+    async def release(self, latency: float, throttled: bool = False, sample: bool = True):
+        """Free a slot; with sample=False (e.g. a cancelled call) the limit is left as it is"""
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+
+            if sample and (throttled or latency > self.latency_threshold):
+                # Only back off once per cooldown, not once per in-flight call that failed together
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                    self._last_decrease = now
+            elif sample:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+            condition.notify_all()
+
+class ProviderPermit:
+    """Handle for one provider call; the caller flags throttling responses on it"""
+
+    def __init__(self):
+        self.throttled = False
+        self.failed = False
+        self.cancelled = False
+
+    def throttle(self):
+        """Mark the call as rate limited by the provider (e.g. HTTP 429)"""
+        self.throttled = True
+        self.failed = True
+
+    def fail(self):
+        """Mark the call as failed"""
+        self.failed = True
+
+    def cancel(self):
+        """Mark the call as abandoned before it finished; it says nothing about the provider"""
+        self.cancelled = True
+
+class ProviderLimiter:
+    """Rate and concurrency limits shared by every call to one provider"""
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_minute: float,
+        max_concurrency: int,
+        max_wait: float = 5.0,
+        latency_threshold: float = 2.0
+    ):
+        self.name = name
+        self.bucket = TokenBucket(rate_per_minute)
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            initial=min(5, max_concurrency),
+            max_limit=max_concurrency,
+            latency_threshold=latency_threshold
+        )
+        self.max_wait = max_wait
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[ProviderPermit]:
+        """
+        Wait up to max_wait each for a rate token and a concurrency slot, then time
+        the call. A token whose call never gets a slot is returned to the bucket.
+        """
+        if not await self.bucket.acquire(self.max_wait):
+            raise RateLimitExceeded(self.name)
+        try:
+            await asyncio.wait_for(self.concurrency.acquire(), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self.bucket.release()
+            raise RateLimitExceeded(self.name)
+        except asyncio.CancelledError:
+            self.bucket.release()
+            raise
+
+        permit = ProviderPermit()
+        start = time.monotonic()
+        try:
+            yield permit
+        except asyncio.CancelledError:
+            permit.cancel()
+            raise
+        except Exception:
+            permit.fail()
+            raise
+        finally:
+            await self.concurrency.release(
+                time.monotonic() - start, permit.throttled, sample=not permit.cancelled
+            )
+            if permit.throttled:
+                logger.warning(
+                    f"{self.name} throttled requests, concurrency limit now {self.concurrency.current_limit}"
+                )
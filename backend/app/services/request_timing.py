@@ -0,0 +1,153 @@
+"""
+Request Timing
+Per-request phase timings sent as a Server-Timing header, with a trace logged for slow requests
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+class RequestTiming:
+    """Phase durations and cache/provider activity collected while serving one request"""
+
+    def __init__(self):
+        # Phase name -> seconds, in the order phases first ran
+        self.phases: Dict[str, float] = {}
+        self.queries = 0
+        self.cache_misses: List[str] = []
+        # (provider, outcome, seconds) per provider call
+        self.provider_calls: List[Tuple[str, str, float]] = []
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def header(self, total: float) -> str:
+        """Server-Timing header value, durations in milliseconds"""
+        parts = []
+        for phase, seconds in self.phases.items():
+            desc = f';desc="{self.queries} queries"' if phase == "db" else ""
+            parts.append(f"{phase}{desc};dur={seconds * 1000:.1f}")
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+_current_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Add the duration of the block to a phase of the current request, if any"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing = _current_timing.get()
+        if timing is not None:
+            timing.add(phase, time.perf_counter() - start)
+
+def note_cache_miss(symbol: str):
+    """Record that the current request had to wait on providers for a symbol"""
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.cache_misses.append(symbol)
+
+def note_provider_call(provider: str, outcome: str, seconds: float):
+    """Record a provider call made on behalf of the current request"""
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.provider_calls.append((provider, outcome, seconds))
+
+def track_query_time(engine: Engine):
+    """Count cursor execution time on an engine towards the current request's "db" phase"""
+
+    # The start time lives on the execution context, so a failed statement leaves
+    # nothing behind on the pooled connection
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "query_start", None)
+        timing = _current_timing.get()
+        if timing is not None and start is not None:
+            timing.queries += 1
+            timing.add("db", time.perf_counter() - start)
+
+class ServerTimingMiddleware:
+    """
+    Times each HTTP request and adds a Server-Timing header with its phases.
+    Requests slower than the threshold (SLOW_REQUEST_THRESHOLD seconds) get a
+    trace logged, including the time spent writing the response body, which
+    happens after the header is sent.
+    """
+
+    def __init__(self, app: ASGIApp, slow_threshold: Optional[float] = None):
+        self.app = app
+        self.slow_threshold = (
+            slow_threshold if slow_threshold is not None
+            else float(os.getenv('SLOW_REQUEST_THRESHOLD', '1.0'))
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _current_timing.set(timing)
+        start = time.perf_counter()
+        response_start: Optional[float] = None
+        status = 500
+        streaming = False
+
+        async def send_with_timing(message: Message):
+            nonlocal response_start, status, streaming
+            if message["type"] == "http.response.start":
+                response_start = time.perf_counter()
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                streaming = headers.get("content-type", "").startswith("text/event-stream")
+                headers.append("Server-Timing", timing.header(response_start - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timing.reset(token)
+            end = time.perf_counter()
+            # Event streams stay open by design; their duration isn't latency
+            if end - start >= self.slow_threshold and not streaming:
+                write = end - response_start if response_start is not None else None
+                self._log_slow(scope, status, timing, end - start, write)
+
+    def _log_slow(self, scope: Scope, status: int, timing: RequestTiming, total: float, write: Optional[float]):
+        route = scope.get("route")
+        slowest = sorted(timing.provider_calls, key=lambda call: call[2], reverse=True)[:10]
+        trace = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": getattr(route, "path", None),
+            "status": status,
+            "total_ms": round(total * 1000, 1),
+            "phases_ms": {phase: round(seconds * 1000, 1) for phase, seconds in timing.phases.items()},
+            "write_ms": round(write * 1000, 1) if write is not None else None,
+            "queries": timing.queries,
+            "cache_misses": timing.cache_misses[:50],
+            "cache_miss_count": len(timing.cache_misses),
+            "slowest_provider_calls": [
+                {"provider": provider, "outcome": outcome, "ms": round(seconds * 1000, 1)}
+                for provider, outcome, seconds in slowest
+            ],
+        }
+        logger.warning(f"Slow request: {json.dumps(trace)}")
@@ -0,0 +1,109 @@
+"""
+Response Cache
+Short-lived cache of serialized list responses with strong ETags for conditional GETs
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import logging
+
+from fastapi import Request, Response
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CachedResponse:
+    """Serialized response body with its validator"""
+    body: bytes
+    etag: str
+    timestamp: float
+    headers: Dict[str, str] = field(default_factory=dict)
+
+class ResponseCache:
+    """
+    Process-wide cache of JSON responses keyed on path and query parameters.
+    Within the TTL a request is answered from memory (a 304 when its
+    If-None-Match matches) without touching the database or re-serializing.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+    @staticmethod
+    def key(request: Request) -> str:
+        """Cache key: path without trailing slash plus the sorted query parameters"""
+        query = sorted(request.query_params.multi_items())
+        return f"{request.url.path.rstrip('/')}?{json.dumps(query)}"
+
+    @staticmethod
+    def make_etag(body: bytes, headers: Dict[str, str]) -> str:
+        """Strong ETag from the exact bytes served: the body and its headers (e.g. the next-page cursor)"""
+        digest = hashlib.sha256(body)
+        digest.update(json.dumps(sorted(headers.items())).encode())
+        return f'"{digest.hexdigest()[:32]}"'
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.timestamp >= self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def store(
+        self,
+        key: str,
+        body: bytes,
+        headers: Optional[Dict[str, str]] = None
+    ) -> CachedResponse:
+        headers = headers or {}
+        entry = CachedResponse(
+            body=body,
+            etag=self.make_etag(body, headers),
+            timestamp=time.time(),
+            headers=headers
+        )
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, path_prefix: str = ""):
+        """Drop every entry whose path starts with path_prefix (everything by default)"""
+        stale = [key for key in self.entries if key.startswith(path_prefix)]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            logger.debug(f"Invalidated {len(stale)} cached responses under {path_prefix or '/'}")
+
+    @staticmethod
+    def _matches(request: Request, etag: str) -> bool:
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        # If-None-Match uses weak comparison, so a W/ prefix still matches
+        candidates = [tag.strip() for tag in header.split(",")]
+        return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+    def respond(self, request: Request, entry: CachedResponse) -> Response:
+        """304 if the client already has this version, otherwise the cached body"""
+        # no-cache lets browsers keep the body but revalidate it on every poll
+        headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "no-cache"}
+        if self._matches(request, entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+response_cache = ResponseCache(
+    ttl=float(os.getenv('RESPONSE_CACHE_TTL', '30')),
+    max_entries=int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '1000'))
+)
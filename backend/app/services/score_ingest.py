@@ -0,0 +1,210 @@
+"""
+Score Ingestion
+Streams CSV or NDJSON score records into the scores table in bounded multi-row batches
+
+Usage: python -m app.services.score_ingest scores.ndjson [--format csv] [--batch-size N] [--strict]
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+from typing import Any, AsyncIterable, AsyncIterator, Dict, IO, List, Optional, Tuple
+import logging
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Score, Security
+from ..schemas import ScoreCreate, ScoreIngestError, ScoreIngestResult
+from .response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = int(os.getenv('SCORE_INGEST_BATCH_SIZE', '1000'))
+# 4 bind parameters per row; keeps a batch well under the driver's parameter limit
+MAX_BATCH_SIZE = 5000
+FACTOR_COLUMNS = ("fundamental", "technical", "sentiment", "momentum")
+
+class ScoreIngestRejected(Exception):
+    """Raised in strict mode when a record is invalid; nothing is committed"""
+
+    def __init__(self, result: ScoreIngestResult):
+        super().__init__(f"Score ingestion rejected: {result.errors[0].error if result.errors else 'invalid record'}")
+        self.result = result
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split a stream of byte chunks (e.g. a request body) into text lines"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8").rstrip("\r")
+
+async def _file_lines(handle: IO[str]) -> AsyncIterator[str]:
+    for line in handle:
+        yield line.rstrip("\r\n")
+
+def _csv_record(header: List[str], line: str) -> Dict[str, Any]:
+    """CSV row to a score record; factors come from a JSON column or one column per factor"""
+    values = next(csv.reader([line]))
+    if len(values) != len(header):
+        raise ValueError(f"expected {len(header)} columns, got {len(values)}")
+    row = {name: value.strip() or None for name, value in zip(header, values)}
+
+    breakdown = row.pop("factor_breakdown_json", None)
+    record: Dict[str, Any] = {
+        "symbol": row.get("symbol"),
+        "score_value": row.get("score_value"),
+        "calculated_at": row.get("calculated_at"),
+    }
+    if breakdown:
+        record["factor_breakdown_json"] = json.loads(breakdown)
+    else:
+        factors = {name: row[name] for name in FACTOR_COLUMNS if row.get(name) is not None}
+        if factors:
+            record["factor_breakdown_json"] = factors
+    return record
+
+async def parse_records(lines: AsyncIterable[str], fmt: str) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yield (line number, record dict) for each non-blank line; a line that can't be
+    parsed yields the exception instead so it is reported, not fatal
+    """
+    header: Optional[List[str]] = None
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        if fmt == "csv" and header is None:
+            header = [name.strip().lower() for name in next(csv.reader([line]))]
+            continue
+        try:
+            record = _csv_record(header, line) if fmt == "csv" else json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("record must be a JSON object")
+            yield line_number, record
+        except ValueError as e:
+            yield line_number, e
+
+async def _insert_batch(db: AsyncSession, batch: List[Tuple[int, ScoreCreate]], reject) -> int:
+    """Insert one batch as a single multi-row INSERT, rejecting unknown symbols first"""
+    symbols = {record.symbol for _, record in batch}
+    known = set((await db.execute(
+        select(Security.symbol).where(Security.symbol.in_(symbols))
+    )).scalars().all())
+
+    rows = []
+    for line_number, record in batch:
+        if record.symbol not in known:
+            reject(line_number, f"unknown symbol {record.symbol}")
+            continue
+        breakdown = record.factor_breakdown_json
+        rows.append({
+            "symbol": record.symbol,
+            "score_value": record.score_value,
+            # Same default as the column, evaluated by the database
+            "calculated_at": record.calculated_at or func.now(),
+            "factor_breakdown_json": breakdown.model_dump(exclude_none=True) if breakdown else None,
+        })
+    if rows:
+        await db.execute(insert(Score).values(rows))
+    return len(rows)
+
+async def ingest_scores(
+    db: AsyncSession,
+    lines: AsyncIterable[str],
+    fmt: str = "ndjson",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    strict: bool = False,
+    max_errors: int = 100
+) -> ScoreIngestResult:
+    """
+    Validate and insert score records in batches of batch_size, all in one transaction
+    that is committed at the end. Invalid records are skipped and reported, or in
+    strict mode abort the whole load.
+    """
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+    received = inserted = rejected = 0
+    errors: List[ScoreIngestError] = []
+
+    def result() -> ScoreIngestResult:
+        return ScoreIngestResult(received=received, inserted=inserted, rejected=rejected, errors=errors)
+
+    def reject(line_number: int, error: str):
+        nonlocal rejected
+        rejected += 1
+        if len(errors) < max_errors:
+            errors.append(ScoreIngestError(line=line_number, error=error))
+        if strict:
+            raise ScoreIngestRejected(result())
+
+    batch: List[Tuple[int, ScoreCreate]] = []
+    try:
+        async for line_number, raw in parse_records(lines, fmt):
+            received += 1
+            if isinstance(raw, Exception):
+                reject(line_number, f"unparseable record: {raw}")
+                continue
+            if isinstance(raw.get("symbol"), str):
+                raw["symbol"] = raw["symbol"].strip().upper()
+            try:
+                batch.append((line_number, ScoreCreate.model_validate(raw)))
+            except ValidationError as e:
+                reject(line_number, "; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                ))
+                continue
+
+            if len(batch) >= batch_size:
+                inserted += await _insert_batch(db, batch, reject)
+                batch = []
+
+        if batch:
+            inserted += await _insert_batch(db, batch, reject)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    # Cached list responses embed latest scores
+    response_cache.invalidate("/api/securities")
+    logger.info(f"Ingested {inserted} of {received} score records ({rejected} rejected)")
+    return result()
+
+async def _main(argv: Optional[List[str]] = None) -> int:
+    from ..database import AsyncSessionLocal, async_engine
+
+    parser = argparse.ArgumentParser(description="Bulk-load scores from CSV or NDJSON")
+    parser.add_argument("path", help="File to load, or - for stdin")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Defaults to the file extension, else ndjson")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--strict", action="store_true", help="Load nothing if any record is invalid")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    handle = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8", newline="")
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await ingest_scores(db, _file_lines(handle), fmt, args.batch_size, args.strict)
+    except ScoreIngestRejected as e:
+        print(e.result.model_dump_json(indent=2))
+        return 1
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+        await async_engine.dispose()
+
+    print(result.model_dump_json(indent=2))
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main()))
@@ -0,0 +1,118 @@
+"""
+Score Queries
+Latest-score lookups and score history queries
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import Numeric, Select, func, literal, literal_column, select, type_coerce
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from sqlalchemy.engine import Result
+
+from ..models import Security, Score, SecurityLatestScore
+
+def with_latest_score(query: Select) -> Select:
+    """
+    Add each security's most recent score to a select(Security) query: a primary
+    key join to the trigger-maintained security_latest_score projection, so the
+    caller can also filter and sort on SecurityLatestScore columns
+    """
+    return query.add_columns(SecurityLatestScore).outerjoin(
+        SecurityLatestScore, SecurityLatestScore.symbol == Security.symbol
+    )
+
+def securities_from_rows(result: Result) -> List[Security]:
+    """Unpack (Security, SecurityLatestScore) rows from with_latest_score, attaching the score"""
+    securities = []
+    for security, score in result.all():
+        security.latest_score = score
+        securities.append(security)
+    return securities
+
+# date_trunc units for score history buckets, with their approximate length in seconds
+BUCKET_UNITS: Dict[str, int] = {
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+    "week": 604800,
+    "month": 2629800,
+    "year": 31557600,
+}
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """scores.calculated_at is a timestamp without time zone holding UTC; aware values are converted to match"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def choose_bucket(start: datetime, end: datetime, points: int) -> str:
+    """Smallest bucket unit that fits the time range into the point budget"""
+    span = (end - start).total_seconds()
+    for unit, seconds in BUCKET_UNITS.items():
+        if span / seconds < points:
+            return unit
+    return "year"
+
+def _history_range(symbol: str, start: Optional[datetime], end: Optional[datetime]) -> list:
+    # symbol equality plus a calculated_at range: a range scan of the (symbol, calculated_at) index
+    criteria = [Score.symbol == symbol]
+    if start is not None:
+        criteria.append(Score.calculated_at >= start)
+    if end is not None:
+        criteria.append(Score.calculated_at < end)
+    return criteria
+
+def first_score_time(symbol: str, start: Optional[datetime], end: Optional[datetime]) -> Select:
+    return select(func.min(Score.calculated_at)).where(*_history_range(symbol, start, end))
+
+def raw_history_query(symbol: str, start: Optional[datetime], end: Optional[datetime], limit: int) -> Select:
+    """The most recent `limit` scores in the range as points, oldest first"""
+    recent = (
+        select(Score.calculated_at.label("time"), Score.score_value.label("value"))
+        .where(*_history_range(symbol, start, end))
+        .order_by(Score.calculated_at.desc())
+        .limit(limit)
+        .subquery()
+    )
+    return select(
+        recent.c.time,
+        recent.c.value,
+        recent.c.value.label("avg"),
+        recent.c.value.label("min"),
+        recent.c.value.label("max"),
+        literal(1).label("count"),
+    ).order_by(recent.c.time)
+
+def bucketed_history_query(
+    symbol: str,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    unit: str,
+    limit: int
+) -> Select:
+    """Scores aggregated per date_trunc(unit) bucket (last/avg/min/max/count), the most recent `limit` buckets oldest first"""
+    if unit not in BUCKET_UNITS:
+        raise ValueError(f"Unknown bucket unit {unit}")
+    # A literal (not a bind parameter) so SELECT and GROUP BY hold the identical expression
+    time = func.date_trunc(literal_column(f"'{unit}'"), Score.calculated_at)
+    last = type_coerce(
+        func.array_agg(aggregate_order_by(Score.score_value, Score.calculated_at.desc())),
+        ARRAY(Numeric(5, 2))
+    )[1]
+    buckets = (
+        select(
+            time.label("time"),
+            last.label("value"),
+            func.round(func.avg(Score.score_value), 2).label("avg"),
+            func.min(Score.score_value).label("min"),
+            func.max(Score.score_value).label("max"),
+            func.count().label("count"),
+        )
+        .where(*_history_range(symbol, start, end))
+        .group_by(time)
+        .order_by(time.desc())
+        .limit(limit)
+        .subquery()
+    )
+    return select(buckets).order_by(buckets.c.time)
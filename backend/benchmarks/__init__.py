@@ -0,0 +1,4 @@
+"""
+AiiA Benchmarks
+Local provider stand-ins, synthetic data and a load generator for repeatable performance runs
+"""
@@ -0,0 +1,186 @@
+"""
+Load Generator
+Closed-loop HTTP load against the API's read endpoints, reporting throughput and latency percentiles per scenario
+
+Usage: python -m benchmarks.load --base-url http://127.0.0.1:8000 --manifest bench-data.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_SERVER_TIMING_ENTRY = re.compile(r"([\w-]+)[^,]*?;dur=([\d.]+)")
+
+@dataclass
+class Scenario:
+    """A named request mix: each call of path() picks the next URL"""
+    name: str
+    path: Callable[[random.Random], str]
+
+@dataclass
+class ScenarioResult:
+    name: str
+    requests: int
+    errors: int
+    seconds: float
+    throughput: float  # Successful requests per second
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    # Mean Server-Timing phase durations reported by the API
+    server_phases_ms: Dict[str, float] = field(default_factory=dict)
+
+def default_scenarios(manifest: Dict[str, List]) -> List[Scenario]:
+    """The dashboard's read paths over the seeded symbols and users"""
+    symbols = manifest["symbols"]
+    user_ids = manifest["user_ids"]
+    scenarios = [
+        Scenario("securities_page", lambda rng: "/api/securities?limit=50"),
+        Scenario("securities_by_score", lambda rng: "/api/securities?limit=50&sort=score&order=desc"),
+    ]
+    if symbols:
+        scenarios.append(Scenario("security_detail", lambda rng: f"/api/securities/{rng.choice(symbols)}"))
+    if user_ids:
+        scenarios.append(Scenario("user_watchlists", lambda rng: f"/api/users/{rng.choice(user_ids)}/watchlists"))
+    return scenarios
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list (q in 0-100)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), math.ceil(q / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    concurrency: int = 10,
+    duration: float = 30.0,
+    warmup: float = 5.0,
+    random_seed: int = 0
+) -> ScenarioResult:
+    """Keep `concurrency` requests in flight for warmup + duration seconds, measuring only after warmup"""
+    rng = random.Random(random_seed)
+    latencies: List[float] = []
+    phases: Dict[str, float] = {}
+    errors = 0
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < stop_at:
+            path = scenario.path(rng)
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                ok = response.status_code < 400
+            except httpx.HTTPError as e:
+                logger.debug(f"{scenario.name}: {path} failed: {e}")
+                response, ok = None, False
+            end = time.perf_counter()
+            if start < measure_from:
+                continue
+            if not ok:
+                errors += 1
+                continue
+            latencies.append(end - start)
+            for name, duration_ms in _SERVER_TIMING_ENTRY.findall(response.headers.get("server-timing", "")):
+                phases[name] = phases.get(name, 0.0) + float(duration_ms)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    latencies.sort()
+    measured = max(time.perf_counter() - measure_from, 1e-9)
+    return ScenarioResult(
+        name=scenario.name,
+        requests=len(latencies) + errors,
+        errors=errors,
+        seconds=round(measured, 2),
+        throughput=round(len(latencies) / measured, 2),
+        p50_ms=round(percentile(latencies, 50) * 1000, 2),
+        p95_ms=round(percentile(latencies, 95) * 1000, 2),
+        p99_ms=round(percentile(latencies, 99) * 1000, 2),
+        max_ms=round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        server_phases_ms={name: round(total / len(latencies), 2) for name, total in phases.items()} if latencies else {},
+    )
+
+async def run_scenarios(
+    base_url: str,
+    scenarios: List[Scenario],
+    concurrency: int = 10,
+    duration: float = 30.0,
+    warmup: float = 5.0
+) -> List[ScenarioResult]:
+    """Run each scenario in turn against a running API"""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        results = []
+        for index, scenario in enumerate(scenarios):
+            logger.info(f"Running {scenario.name} for {duration}s at concurrency {concurrency}")
+            results.append(await run_scenario(client, scenario, concurrency, duration, warmup, random_seed=index))
+        return results
+
+def format_results(results: List[ScenarioResult]) -> str:
+    """Results as an aligned text table"""
+    header = f"{'scenario':<22}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'errors':>8}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            f"{result.name:<22}{result.throughput:>10.1f}{result.p50_ms:>10.1f}{result.p95_ms:>10.1f}"
+            f"{result.p99_ms:>10.1f}{result.max_ms:>10.1f}{result.errors:>8}"
+        )
+    return "\n".join(lines)
+
+def results_json(results: List[ScenarioResult], **metadata) -> Dict:
+    return {**metadata, "scenarios": {result.name: asdict(result) for result in results}}
+
+def add_load_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--manifest", default="bench-data.json", help="Written by benchmarks.seed")
+    parser.add_argument("--scenario", action="append", help="Only run these scenarios (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before each scenario")
+    parser.add_argument("--output", help="Write results as JSON")
+
+def select_scenarios(manifest: Dict[str, List], names: Optional[List[str]]) -> List[Scenario]:
+    scenarios = default_scenarios(manifest)
+    if names:
+        unknown = set(names) - {scenario.name for scenario in scenarios}
+        if unknown:
+            raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        scenarios = [scenario for scenario in scenarios if scenario.name in names]
+    return scenarios
+
+async def _main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate load against a running AiiA API")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    add_load_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with open(args.manifest, encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    results = await run_scenarios(
+        args.base_url, select_scenarios(manifest, args.scenario), args.concurrency, args.duration, args.warmup
+    )
+    print(format_results(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results_json(results, concurrency=args.concurrency), handle, indent=2)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -0,0 +1,244 @@
+"""
+Query Plan Checks
+Captures the SQL each read endpoint issues and fails when its EXPLAIN (ANALYZE, BUFFERS) plan exceeds budgets
+
+Usage: python -m benchmarks.plans [--case user_watchlists] [--output plans.json]
+
+Run against a local PostgreSQL filled by benchmarks.scale_seed; plans on a small
+database say little about production.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PlanBudget:
+    """Limits one query's plan must stay within"""
+    max_buffers: int = 20000  # Shared buffers hit or read by the whole plan (8kB each)
+    max_rows: int = 100000  # Rows produced by any single plan node, over all its loops
+    seq_scan_rows: int = 1000  # A sequential scan reading more rows than this fails
+    allow_seq_scan: Tuple[str, ...] = ()  # Relations exempt from the sequential scan rule
+
+@dataclass
+class PlanCase:
+    """An API request whose queries are checked; {symbol}, {sector}, {user_id} and {user_ids} are filled from the data"""
+    name: str
+    path: str
+    budget: PlanBudget = field(default_factory=PlanBudget)
+    # Also request the page after the first, so the keyset cursor query is checked
+    follow_cursor: bool = False
+
+# Sorting on a coalesced sort key spans every listed security (and the outer-joined
+# latest score), so these plans sort the catalogue rather than walk an index; they are
+# bounded by the number of securities, not by score history
+_CATALOGUE_SORT = PlanBudget(allow_seq_scan=("securities", "security_latest_score"))
+
+CASES: List[PlanCase] = [
+    PlanCase("securities_page", "/api/securities?limit=50", follow_cursor=True),
+    PlanCase("securities_by_score", "/api/securities?limit=50&sort=score&order=desc", _CATALOGUE_SORT, follow_cursor=True),
+    PlanCase("securities_by_market_cap", "/api/securities?limit=50&sort=market_cap&order=desc", _CATALOGUE_SORT),
+    PlanCase("securities_min_score", "/api/securities?limit=50&min_score=80"),
+    PlanCase("securities_sector", "/api/securities?limit=50&sector={sector}"),
+    PlanCase("security_detail", "/api/securities/{symbol}"),
+    PlanCase("score_history_raw", "/api/securities/{symbol}/scores?bucket=raw&points=500"),
+    PlanCase("score_history_daily", "/api/securities/{symbol}/scores?bucket=day"),
+    PlanCase("score_history_auto", "/api/securities/{symbol}/scores"),
+    PlanCase("user_watchlists", "/api/users/{user_id}/watchlists"),
+    PlanCase("users_watchlists", "/api/users/watchlists?user_ids={user_ids}"),
+]
+
+@dataclass
+class QueryPlan:
+    statement: str
+    execution_ms: float
+    buffers: int
+    violations: List[str]
+    plan: Any = None
+
+@dataclass
+class CaseResult:
+    name: str
+    path: str
+    queries: List[QueryPlan]
+    errors: List[str]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and not any(query.violations for query in self.queries)
+
+def _nodes(plan: Dict) -> Iterator[Dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+def check_plan(plan: Dict, budget: PlanBudget) -> List[str]:
+    """Budget violations of one EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) plan"""
+    violations = []
+    root = plan["Plan"]
+    buffers = root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)
+    if buffers > budget.max_buffers:
+        violations.append(f"touched {buffers} buffers (budget {budget.max_buffers})")
+
+    for node in _nodes(root):
+        loops = node.get("Actual Loops", 1)
+        rows = node.get("Actual Rows", 0) * loops
+        if rows > budget.max_rows:
+            violations.append(f"{node['Node Type']} produced {rows} rows (budget {budget.max_rows})")
+        if node["Node Type"] == "Seq Scan":
+            relation = node.get("Relation Name")
+            # Row counts are per loop
+            scanned = (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * loops
+            if relation not in budget.allow_seq_scan and scanned > budget.seq_scan_rows:
+                violations.append(f"Seq Scan on {relation} read {scanned} rows (budget {budget.seq_scan_rows})")
+    return violations
+
+class _QueryCapture:
+    """Records the read statements an engine executes while active"""
+
+    def __init__(self):
+        self.active = False
+        self.statements: List[Tuple[str, Any]] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            self.statements.append((statement, parameters))
+
+async def _sample_values() -> Dict[str, str]:
+    """Representative path values: a symbol with a score history, a sector and users with watchlists"""
+    from sqlalchemy import select
+    from app.database import AsyncSessionLocal
+    from app.models import Score, Security, Watchlist
+
+    async with AsyncSessionLocal() as db:
+        symbol = (await db.execute(select(Score.symbol).order_by(Score.id.desc()).limit(1))).scalar()
+        sector = (await db.execute(
+            select(Security.sector).where(Security.sector.is_not(None)).order_by(Security.symbol).limit(1)
+        )).scalar()
+        user_ids = (await db.execute(
+            select(Watchlist.user_id).group_by(Watchlist.user_id).order_by(Watchlist.user_id.desc()).limit(50)
+        )).scalars().all()
+    if not symbol or not user_ids:
+        raise SystemExit("No scores or watchlists to check plans against; run benchmarks.scale_seed first")
+    return {
+        "symbol": symbol,
+        "sector": sector or "",
+        "user_id": str(user_ids[0]),
+        "user_ids": ",".join(str(user_id) for user_id in user_ids),
+    }
+
+async def _explain(statement: str, parameters: Any) -> Dict:
+    from app.database import async_engine
+
+    async with async_engine.connect() as conn:
+        result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters)
+        plan = result.scalar()
+        await conn.rollback()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]
+
+async def check_cases(cases: List[PlanCase]) -> List[CaseResult]:
+    """Issue each case's requests in-process, then EXPLAIN ANALYZE every query they ran"""
+    import httpx
+    from sqlalchemy import event
+    from app.database import async_engine
+    from app.main import app
+    from app.services.market_data import cleanup_market_data_service
+
+    capture = _QueryCapture()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    values = await _sample_values()
+    results = []
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://plans") as client:
+            for case in cases:
+                path = case.path.format(**values)
+                errors = []
+                capture.statements = []
+                capture.active = True
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 400:
+                        errors.append(f"{path} returned {response.status_code}")
+                    cursor = response.headers.get("x-next-cursor")
+                    if case.follow_cursor and cursor:
+                        response = await client.get(path, params={"cursor": cursor})
+                        if response.status_code >= 400:
+                            errors.append(f"{path} (next page) returned {response.status_code}")
+                finally:
+                    capture.active = False
+                if not capture.statements:
+                    errors.append("issued no queries")
+
+                queries = []
+                for statement, parameters in capture.statements:
+                    plan = await _explain(statement, parameters)
+                    queries.append(QueryPlan(
+                        statement=" ".join(statement.split()),
+                        execution_ms=round(plan.get("Execution Time", 0.0), 2),
+                        buffers=plan["Plan"].get("Shared Hit Blocks", 0) + plan["Plan"].get("Shared Read Blocks", 0),
+                        violations=check_plan(plan, case.budget),
+                        plan=plan,
+                    ))
+                results.append(CaseResult(case.name, path, queries, errors))
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+        await cleanup_market_data_service()
+    return results
+
+def format_report(results: List[CaseResult]) -> str:
+    lines = []
+    for result in results:
+        slowest = max((query.execution_ms for query in result.queries), default=0.0)
+        buffers = sum(query.buffers for query in result.queries)
+        status = "ok" if result.ok else "FAIL"
+        lines.append(
+            f"{status:<5}{result.name:<26}{len(result.queries):>3} queries {slowest:>9.2f} ms max {buffers:>8} buffers"
+        )
+        for error in result.errors:
+            lines.append(f"       {error}")
+        for query in result.queries:
+            for violation in query.violations:
+                lines.append(f"       {violation}: {query.statement[:160]}")
+    return "\n".join(lines)
+
+async def _main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the query plans of the API's read endpoints")
+    parser.add_argument("--case", action="append", help="Only check these cases (repeatable)")
+    parser.add_argument("--output", help="Write every plan and violation as JSON")
+    args = parser.parse_args(argv)
+
+    # Every request must reach the database, and enrichment must not call real providers
+    os.environ["RESPONSE_CACHE_TTL"] = "0"
+    for key in ("FINNHUB_API_KEY", "ALPHAVANTAGE_API_KEY", "ALPACA_API_KEY_ID"):
+        os.environ[key] = ""
+
+    cases = CASES
+    if args.case:
+        unknown = set(args.case) - {case.name for case in CASES}
+        if unknown:
+            raise SystemExit(f"Unknown cases: {', '.join(sorted(unknown))}")
+        cases = [case for case in CASES if case.name in args.case]
+
+    results = await check_cases(cases)
+    print(format_report(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump([{**asdict(result), "ok": result.ok} for result in results], handle, indent=2, default=str)
+
+    failed = [result.name for result in results if not result.ok]
+    if failed:
+        print(f"{len(failed)} of {len(results)} cases exceeded their plan budgets")
+        return 1
+    print(f"All {len(results)} cases within their plan budgets")
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(asyncio.run(_main()))
@@ -0,0 +1,287 @@
+"""
+Provider Stand-ins
+Local aiohttp server imitating Finnhub, AlphaVantage and Alpaca with configurable latency, errors and rate limits
+
+Usage: python -m benchmarks.providers [--port 8900] [--profile realistic]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+import logging
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ("finnhub", "alphavantage", "alpaca")
+
+SECTORS = [
+    "Technology", "Healthcare", "Financial Services", "Consumer Cyclical", "Industrials",
+    "Communication Services", "Consumer Defensive", "Energy", "Utilities", "Real Estate", "Basic Materials",
+]
+
+# Symbols with this prefix are unknown to every stand-in, like delisted tickers
+UNKNOWN_PREFIX = "ZZ"
+
+@dataclass
+class ProviderProfile:
+    """How one stand-in behaves"""
+    latency: float = 0.05  # Median response time in seconds
+    jitter: float = 0.3  # Log-normal sigma around the median; 0 for a fixed latency
+    error_rate: float = 0.0  # Share of requests answered with HTTP 500
+    rate_limit: Optional[float] = None  # Requests per minute before throttling, None for unlimited
+
+PROFILES: Dict[str, Dict[str, ProviderProfile]] = {
+    # Near-instant providers: measures the API itself
+    "fast": {
+        provider: ProviderProfile(latency=0.002, jitter=0.0) for provider in PROVIDERS
+    },
+    # Typical latencies of the real services, with occasional failures
+    "realistic": {
+        "finnhub": ProviderProfile(latency=0.12, jitter=0.4, error_rate=0.005, rate_limit=300),
+        "alphavantage": ProviderProfile(latency=0.35, jitter=0.5, error_rate=0.01, rate_limit=75),
+        "alpaca": ProviderProfile(latency=0.08, jitter=0.4, error_rate=0.005, rate_limit=200),
+    },
+    # Slow, failing and throttling providers: exercises hedging, breakers and stale serving
+    "degraded": {
+        "finnhub": ProviderProfile(latency=0.9, jitter=0.8, error_rate=0.15, rate_limit=60),
+        "alphavantage": ProviderProfile(latency=1.5, jitter=0.6, error_rate=0.1, rate_limit=5),
+        "alpaca": ProviderProfile(latency=0.5, jitter=0.8, error_rate=0.05, rate_limit=100),
+    },
+}
+
+class _RateWindow:
+    """Token bucket refilled continuously at the per-minute rate"""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(per_minute / 6.0, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+def _base_price(symbol: str) -> float:
+    digest = hashlib.sha256(symbol.encode()).digest()
+    return 5 + int.from_bytes(digest[:4], "big") % 50000 / 100
+
+def _price(symbol: str) -> float:
+    """Deterministic per symbol, drifting slowly so repeated quotes change"""
+    base = _base_price(symbol)
+    phase = _base_price(symbol[::-1])
+    return round(base * (1 + 0.02 * math.sin(time.time() / 120 + phase)), 2)
+
+class ProviderStandIns:
+    """The stand-in handlers, their profiles and request counts"""
+
+    def __init__(self, profiles: Dict[str, ProviderProfile], seed: Optional[int] = None):
+        self.profiles = profiles
+        self.random = random.Random(seed)
+        self.windows = {
+            provider: _RateWindow(profile.rate_limit)
+            for provider, profile in profiles.items() if profile.rate_limit
+        }
+        # (provider, outcome) -> requests
+        self.requests: Counter = Counter()
+
+    async def _behave(self, provider: str) -> Optional[str]:
+        """Sleep for the profile's latency; return "throttled" or "error" if the request should fail"""
+        profile = self.profiles[provider]
+        delay = profile.latency
+        if profile.jitter:
+            delay *= self.random.lognormvariate(0, profile.jitter)
+        await asyncio.sleep(delay)
+
+        window = self.windows.get(provider)
+        if window is not None and not window.take():
+            return "throttled"
+        if self.random.random() < profile.error_rate:
+            return "error"
+        return None
+
+    def _count(self, provider: str, outcome: str):
+        self.requests[(provider, outcome)] += 1
+
+    async def finnhub_quote(self, request: web.Request) -> web.Response:
+        symbol = request.query.get("symbol", "").upper()
+        failure = await self._behave("finnhub")
+        self._count("finnhub", failure or "ok")
+        if failure == "throttled":
+            return web.json_response({"error": "API limit reached"}, status=429)
+        if failure:
+            return web.json_response({"error": "internal error"}, status=500)
+
+        # Finnhub answers unknown symbols with zeros
+        if symbol.startswith(UNKNOWN_PREFIX):
+            return web.json_response({"c": 0, "d": None, "dp": None, "h": 0, "l": 0, "o": 0, "pc": 0, "t": 0})
+        price = _price(symbol)
+        prev_close = round(_base_price(symbol), 2)
+        return web.json_response({
+            "c": price, "d": round(price - prev_close, 2), "dp": round((price - prev_close) / prev_close * 100, 4),
+            "h": max(price, prev_close), "l": min(price, prev_close), "o": prev_close, "pc": prev_close,
+            "t": int(time.time()),
+        })
+
+    async def alphavantage_query(self, request: web.Request) -> web.Response:
+        symbol = request.query.get("symbol", "").upper()
+        failure = await self._behave("alphavantage")
+        self._count("alphavantage", failure or "ok")
+        # AlphaVantage signals its rate limit in a 200 response
+        if failure == "throttled":
+            return web.json_response({"Note": "Thank you for using Alpha Vantage! Our standard API rate limit is 5 requests per minute."})
+        if failure:
+            return web.json_response({"error": "internal error"}, status=500)
+        if request.query.get("function") != "OVERVIEW":
+            return web.json_response({"Error Message": "Invalid API call."})
+
+        if symbol.startswith(UNKNOWN_PREFIX):
+            return web.json_response({})
+        digest = hashlib.sha256(symbol.encode()).digest()
+        return web.json_response({
+            "Symbol": symbol,
+            "Name": f"{symbol} Holdings",
+            "Sector": SECTORS[digest[4] % len(SECTORS)].upper(),
+            "MarketCapitalization": str(int.from_bytes(digest[5:10], "big") % 2_000_000_000_000 + 50_000_000),
+        })
+
+    def _bar(self, symbol: str) -> Dict:
+        price = _price(symbol)
+        return {
+            "t": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "o": round(_base_price(symbol), 2), "h": price, "l": price, "c": price, "v": 1000,
+        }
+
+    async def alpaca_bars_latest(self, request: web.Request) -> web.Response:
+        symbol = request.match_info["symbol"].upper()
+        failure = await self._behave("alpaca")
+        self._count("alpaca", failure or "ok")
+        if failure == "throttled":
+            return web.json_response({"message": "too many requests."}, status=429)
+        if failure:
+            return web.json_response({"message": "internal server error"}, status=500)
+
+        if symbol.startswith(UNKNOWN_PREFIX):
+            return web.json_response({"message": "invalid symbol"}, status=422)
+        return web.json_response({"symbol": symbol, "bar": self._bar(symbol)})
+
+    async def alpaca_snapshots(self, request: web.Request) -> web.Response:
+        symbols = [symbol.upper() for symbol in request.query.get("symbols", "").split(",") if symbol]
+        failure = await self._behave("alpaca")
+        self._count("alpaca", failure or "ok")
+        if failure == "throttled":
+            return web.json_response({"message": "too many requests."}, status=429)
+        if failure:
+            return web.json_response({"message": "internal server error"}, status=500)
+
+        snapshots = {}
+        for symbol in symbols:
+            if symbol.startswith(UNKNOWN_PREFIX):
+                continue
+            bar = self._bar(symbol)
+            snapshots[symbol] = {
+                "latestTrade": {"p": bar["c"], "t": bar["t"]},
+                "dailyBar": bar,
+                "prevDailyBar": {**bar, "c": bar["o"]},
+            }
+        return web.json_response(snapshots)
+
+    async def stats(self, request: web.Request) -> web.Response:
+        counts: Dict[str, Dict[str, int]] = {}
+        for (provider, outcome), count in self.requests.items():
+            counts.setdefault(provider, {})[outcome] = count
+        return web.json_response(counts)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/finnhub/quote", self.finnhub_quote)
+        app.router.add_get("/alphavantage/query", self.alphavantage_query)
+        app.router.add_get("/alpaca/v2/stocks/snapshots", self.alpaca_snapshots)
+        app.router.add_get("/alpaca/v2/stocks/{symbol}/bars/latest", self.alpaca_bars_latest)
+        app.router.add_get("/stats", self.stats)
+        return app
+
+def provider_env(base_url: str) -> Dict[str, str]:
+    """Environment pointing MarketDataService at stand-ins served from base_url"""
+    return {
+        "FINNHUB_BASE_URL": f"{base_url}/finnhub",
+        "ALPHAVANTAGE_BASE_URL": f"{base_url}/alphavantage/query",
+        "ALPACA_BASE_URL": f"{base_url}/alpaca/v2",
+        # Any non-placeholder value counts as configured
+        "FINNHUB_API_KEY": "benchmark",
+        "ALPHAVANTAGE_API_KEY": "benchmark",
+        "ALPACA_API_KEY_ID": "benchmark",
+        "ALPACA_SECRET_KEY": "benchmark",
+    }
+
+def build_profiles(name: str, overrides: Optional[Dict[str, Dict[str, float]]] = None) -> Dict[str, ProviderProfile]:
+    """A named profile with per-provider field overrides, e.g. {"finnhub": {"latency": 0.5}}"""
+    if name not in PROFILES:
+        raise ValueError(f"Unknown provider profile {name!r}; choose from {', '.join(PROFILES)}")
+    profiles = dict(PROFILES[name])
+    for provider, fields in (overrides or {}).items():
+        profiles[provider] = replace(profiles[provider], **fields)
+    return profiles
+
+async def start_stand_ins(stand_ins: ProviderStandIns, host: str = "127.0.0.1", port: int = 8900) -> web.AppRunner:
+    """Serve the stand-ins in the running event loop; call runner.cleanup() to stop"""
+    runner = web.AppRunner(stand_ins.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Provider stand-ins listening on http://{host}:{port}")
+    return runner
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--profile", choices=list(PROFILES), default="realistic", help="Provider behaviour profile")
+    for provider in PROVIDERS:
+        for field_name in ("latency", "jitter", "error_rate", "rate_limit"):
+            parser.add_argument(
+                f"--{provider}-{field_name.replace('_', '-')}", type=float,
+                dest=f"{provider}_{field_name}", help=f"Override {provider} {field_name}"
+            )
+
+def profile_overrides(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    overrides: Dict[str, Dict[str, float]] = {}
+    for provider in PROVIDERS:
+        for field_name in ("latency", "jitter", "error_rate", "rate_limit"):
+            value = getattr(args, f"{provider}_{field_name}")
+            if value is not None:
+                overrides.setdefault(provider, {})[field_name] = value
+    return overrides
+
+async def _main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve local market data provider stand-ins")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--seed", type=int, help="Random seed for latency and error sampling")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    stand_ins = ProviderStandIns(build_profiles(args.profile, profile_overrides(args)), seed=args.seed)
+    runner = await start_stand_ins(stand_ins, args.host, args.port)
+    for name, value in provider_env(f"http://{args.host}:{args.port}").items():
+        print(f"{name}={value}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,149 @@
+"""
+Benchmark Runner
+Starts provider stand-ins and the API, runs the load scenarios and gates on a saved baseline
+
+Usage: python -m benchmarks.run [--seed] [--profile realistic] [--baseline baseline.json] [--save-baseline baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+import logging
+
+import httpx
+
+from .load import add_load_arguments, format_results, results_json, run_scenarios, select_scenarios
+from .providers import ProviderStandIns, add_profile_arguments, build_profiles, profile_overrides, provider_env, start_stand_ins
+
+logger = logging.getLogger(__name__)
+
+# Server settings for repeatable runs; --env overrides them
+DEFAULT_SERVER_ENV = {
+    # Measure the real path, not the response cache
+    "RESPONSE_CACHE_TTL": "0",
+    # Prefetching makes results depend on timing
+    "PREFETCH_ENABLED": "false",
+    # Slow-request traces would flood the output under load
+    "SLOW_REQUEST_THRESHOLD": "60",
+}
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions of results against a baseline: p95/p99 up or throughput down by more than tolerance"""
+    regressions = []
+    for name, before in baseline["scenarios"].items():
+        after = results["scenarios"].get(name)
+        if after is None:
+            regressions.append(f"{name}: missing from this run")
+            continue
+        for metric in ("p95_ms", "p99_ms"):
+            if before[metric] and after[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {before[metric]} -> {after[metric]}")
+        if after["throughput"] < before["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput']} -> {after['throughput']}")
+        before_rate = before["errors"] / before["requests"] if before["requests"] else 0.0
+        after_rate = after["errors"] / after["requests"] if after["requests"] else 0.0
+        if after_rate > before_rate + 0.01:
+            regressions.append(f"{name}: error rate {before_rate:.2%} -> {after_rate:.2%}")
+    return regressions
+
+def _start_server(port: int, env: Dict[str, str], workers: int) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+    ]
+    return subprocess.Popen(command, env={**os.environ, **env})
+
+async def _wait_for_server(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"API did not start at {base_url} within {timeout}s")
+
+async def _stand_in_stats(base_url: str) -> Dict:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        return (await client.get("/stats")).json()
+
+async def _main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the API benchmark against local provider stand-ins")
+    parser.add_argument("--seed", action="store_true", help="Reseed benchmark data (benchmarks.seed defaults) first")
+    parser.add_argument("--api-port", type=int, default=8800)
+    parser.add_argument("--api-url", help="Benchmark an API that is already running instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--stand-in-port", type=int, default=8900)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Extra API environment (repeatable)")
+    parser.add_argument("--baseline", help="Fail if results regress against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", help="Write these results as the new baseline")
+    add_profile_arguments(parser)
+    add_load_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.seed:
+        from .seed import seed
+        with open(args.manifest, "w", encoding="utf-8") as handle:
+            json.dump(seed(clear=True), handle)
+    with open(args.manifest, encoding="utf-8") as handle:
+        manifest = json.load(handle)
+
+    stand_in_url = f"http://127.0.0.1:{args.stand_in_port}"
+    stand_ins = ProviderStandIns(build_profiles(args.profile, profile_overrides(args)), seed=0)
+    runner = await start_stand_ins(stand_ins, "127.0.0.1", args.stand_in_port)
+
+    server = None
+    api_url = args.api_url
+    try:
+        if api_url is None:
+            env = {**DEFAULT_SERVER_ENV, **provider_env(stand_in_url)}
+            env.update(item.split("=", 1) for item in args.env)
+            api_url = f"http://127.0.0.1:{args.api_port}"
+            server = _start_server(args.api_port, env, args.workers)
+            await _wait_for_server(api_url)
+
+        results = await run_scenarios(
+            api_url, select_scenarios(manifest, args.scenario), args.concurrency, args.duration, args.warmup
+        )
+        provider_requests = await _stand_in_stats(stand_in_url)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        await runner.cleanup()
+
+    print(format_results(results))
+    print(f"Provider stand-in requests: {json.dumps(provider_requests)}")
+    report = results_json(
+        results,
+        profile=args.profile,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        provider_requests=provider_requests,
+    )
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare(report, json.load(handle), args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main()))
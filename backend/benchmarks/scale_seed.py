@@ -0,0 +1,170 @@
+"""
+Scale Seeder
+Loads production-sized synthetic data into PostgreSQL with COPY
+
+Usage: python -m benchmarks.scale_seed [--securities 50000] [--scores 400] [--users 20000] [--truncate]
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+import logging
+
+from sqlalchemy import select
+
+from app.database import engine
+from app.models import User, Watchlist
+from .seed import EMAIL_PATTERN, reset, synthetic_scores, synthetic_security
+
+logger = logging.getLogger(__name__)
+
+# Securities whose score histories go into one COPY; bounds the rows the
+# security_latest_score trigger sees in one statement
+SCORE_COPY_SECURITIES = 500
+
+class _CopySource(io.TextIOBase):
+    """File-like CSV view of a row iterator, read incrementally by COPY"""
+
+    def __init__(self, rows: Iterable[Sequence[Any]]):
+        self.rows = iter(rows)
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, lineterminator="\n")
+        self.pending = ""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self.pending) < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            self.writer.writerow(["\\N" if value is None else value for value in row])
+            self.pending += self.buffer.getvalue()
+            self.buffer.seek(0)
+            self.buffer.truncate()
+        if size < 0:
+            size = len(self.pending)
+        chunk, self.pending = self.pending[:size], self.pending[size:]
+        return chunk
+
+def _copy(cursor, table: str, columns: List[str], rows: Iterable[Sequence[Any]]):
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+        _CopySource(rows)
+    )
+
+def _score_rows(symbols: List[str], count: int, end: datetime, rng: random.Random) -> Iterator[tuple]:
+    for symbol in symbols:
+        for score in synthetic_scores(symbol, count, end, rng, interval=timedelta(hours=6)):
+            yield (
+                score["symbol"],
+                score["score_value"],
+                score["calculated_at"].isoformat(sep=" "),
+                json.dumps(score["factor_breakdown_json"]),
+            )
+
+def scale_seed(
+    securities: int = 50000,
+    scores: int = 400,
+    users: int = 20000,
+    watchlists: int = 5,
+    items: int = 10,
+    random_seed: int = 42,
+    truncate: bool = False
+):
+    """
+    COPY securities, score histories, users, watchlists and watchlist items. Each
+    table is committed as it is loaded, so a long load can be watched from psql.
+    """
+    rng = random.Random(random_seed)
+    rows = [synthetic_security(index, rng) for index in range(securities)]
+    symbols = [row["symbol"] for row in rows]
+    end = datetime.utcnow().replace(microsecond=0)
+    started = time.monotonic()
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if truncate:
+            cursor.execute(
+                "TRUNCATE watchlist_items, watchlists, users, scores, security_latest_score, securities "
+                "RESTART IDENTITY CASCADE"
+            )
+        else:
+            with engine.begin() as conn:
+                reset(conn)
+
+        _copy(cursor, "securities", ["symbol", "company_name", "sector", "market_cap", "is_active"], (
+            (row["symbol"], row["company_name"], row["sector"], row["market_cap"], row["is_active"]) for row in rows
+        ))
+        connection.commit()
+        logger.info(f"Copied {len(rows)} securities")
+
+        for start in range(0, len(symbols), SCORE_COPY_SECURITIES):
+            _copy(
+                cursor, "scores", ["symbol", "score_value", "calculated_at", "factor_breakdown_json"],
+                _score_rows(symbols[start:start + SCORE_COPY_SECURITIES], scores, end, rng)
+            )
+            connection.commit()
+            done = min(start + SCORE_COPY_SECURITIES, len(symbols))
+            logger.info(f"Copied scores for {done}/{len(symbols)} securities ({time.monotonic() - started:.0f}s)")
+
+        _copy(cursor, "users", ["email", "password_hash", "first_name", "last_name"], (
+            (f"bench-{index}@example.com", "benchmark", "Bench", f"User {index}") for index in range(users)
+        ))
+        connection.commit()
+        with engine.connect() as conn:
+            user_ids = list(conn.execute(select(User.id).where(User.email.like(EMAIL_PATTERN))).scalars())
+
+        _copy(cursor, "watchlists", ["user_id", "name"], (
+            (user_id, f"Watchlist {number + 1}") for user_id in user_ids for number in range(watchlists)
+        ))
+        connection.commit()
+        with engine.connect() as conn:
+            watchlist_ids = list(conn.execute(
+                select(Watchlist.id).where(Watchlist.user_id.in_(select(User.id).where(User.email.like(EMAIL_PATTERN))))
+            ).scalars())
+
+        _copy(cursor, "watchlist_items", ["watchlist_id", "symbol"], (
+            (watchlist_id, symbol)
+            for watchlist_id in watchlist_ids
+            for symbol in rng.sample(symbols, min(items, len(symbols)))
+        ))
+        connection.commit()
+        logger.info(f"Copied {len(user_ids)} users, {len(watchlist_ids)} watchlists and their items")
+
+        # Fresh statistics, so plans reflect the new row counts
+        cursor.execute("ANALYZE securities, scores, security_latest_score, users, watchlists, watchlist_items")
+        connection.commit()
+    finally:
+        connection.close()
+
+    logger.info(
+        f"Seeded {len(rows)} securities, {len(rows) * scores} scores and "
+        f"{len(watchlist_ids) * items} watchlist items in {time.monotonic() - started:.0f}s"
+    )
+
+def _main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load production-scale synthetic data with COPY")
+    parser.add_argument("--securities", type=int, default=50000)
+    parser.add_argument("--scores", type=int, default=400, help="Scores per security, six hours apart")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--watchlists", type=int, default=5, help="Watchlists per user")
+    parser.add_argument("--items", type=int, default=10, help="Securities per watchlist")
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument(
+        "--truncate", action="store_true",
+        help="Empty every table first instead of deleting earlier benchmark rows (destroys all data)"
+    )
+    args = parser.parse_args(argv)
+    scale_seed(args.securities, args.scores, args.users, args.watchlists, args.items, args.random_seed, args.truncate)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    _main()
@@ -0,0 +1,179 @@
+"""
+Benchmark Seeder
+Fills the database from DATABASE_URL with synthetic securities, scores, users and watchlists
+
+Usage: python -m benchmarks.seed [--securities 2000] [--scores 30] [--users 200] [--reset] [--manifest bench-data.json]
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import logging
+
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.engine import Connection
+
+from app.database import engine
+from app.models import Score, Security, User, Watchlist, WatchlistItem
+from .providers import SECTORS, UNKNOWN_PREFIX
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_PREFIX = "BN"
+UNKNOWN_SYMBOL_PREFIX = f"{UNKNOWN_PREFIX}{SYMBOL_PREFIX}"
+EMAIL_PATTERN = "bench-%@example.com"
+CHUNK_SIZE = 5000
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int = CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _recommendation(value: float) -> str:
+    if value >= 80:
+        return "Strong Buy"
+    if value >= 70:
+        return "Buy"
+    if value >= 60:
+        return "Hold"
+    return "Sell"
+
+def synthetic_security(index: int, rng: random.Random, unknown: bool = False) -> Dict[str, Any]:
+    """One securities row; unknown ones use a symbol no provider stand-in recognises"""
+    prefix = UNKNOWN_SYMBOL_PREFIX if unknown else SYMBOL_PREFIX
+    return {
+        "symbol": f"{prefix}{index:05d}",
+        "company_name": f"Benchmark Company {index}",
+        "sector": rng.choice(SECTORS),
+        # Log-uniform from $50M to $2T, like real listings
+        "market_cap": int(10 ** rng.uniform(7.7, 12.3)),
+        "is_active": rng.random() > 0.02,
+    }
+
+def synthetic_breakdown(value: float, rng: random.Random) -> Dict[str, Any]:
+    """factor_breakdown_json shaped like FactorBreakdown: four factors around the score, sometimes an explanation"""
+    breakdown: Dict[str, Any] = {
+        factor: round(min(max(value + rng.gauss(0, 8), 0), 100), 2)
+        for factor in ("fundamental", "technical", "sentiment", "momentum")
+    }
+    if rng.random() < 0.3:
+        breakdown["explanation"] = {
+            "recommendation": _recommendation(value),
+            "summary": f"Composite of {len(breakdown)} factors",
+            "drivers": rng.sample(["earnings", "valuation", "trend", "news", "volume", "guidance"], 2),
+        }
+    return breakdown
+
+def synthetic_scores(symbol: str, count: int, end: datetime, rng: random.Random, interval: timedelta = timedelta(days=1)) -> Iterator[Dict[str, Any]]:
+    """A random-walk score history for one symbol, one score per interval up to end"""
+    value = rng.uniform(40, 90)
+    for step in range(count):
+        value = min(max(value + rng.gauss(0, 2.5), 1), 99)
+        yield {
+            "symbol": symbol,
+            "score_value": round(value, 2),
+            "calculated_at": end - interval * (count - 1 - step),
+            "factor_breakdown_json": synthetic_breakdown(value, rng),
+        }
+
+def reset(conn: Connection):
+    """Remove every row a previous seed created"""
+    symbols = select(Security.symbol).where(or_(
+        Security.symbol.like(f"{SYMBOL_PREFIX}%"), Security.symbol.like(f"{UNKNOWN_SYMBOL_PREFIX}%")
+    ))
+    users = select(User.id).where(User.email.like(EMAIL_PATTERN))
+    conn.execute(delete(WatchlistItem).where(WatchlistItem.watchlist_id.in_(
+        select(Watchlist.id).where(Watchlist.user_id.in_(users))
+    )))
+    conn.execute(delete(WatchlistItem).where(WatchlistItem.symbol.in_(symbols)))
+    conn.execute(delete(Watchlist).where(Watchlist.user_id.in_(users)))
+    conn.execute(delete(User).where(User.email.like(EMAIL_PATTERN)))
+    conn.execute(delete(Score).where(Score.symbol.in_(symbols)))
+    conn.execute(delete(Security).where(Security.symbol.in_(symbols)))
+
+def seed(
+    securities: int = 2000,
+    scores: int = 30,
+    users: int = 200,
+    watchlists: int = 3,
+    items: int = 20,
+    unknown_share: float = 0.01,
+    random_seed: int = 42,
+    clear: bool = False
+) -> Dict[str, List]:
+    """Insert the synthetic data set in one transaction and return its manifest"""
+    rng = random.Random(random_seed)
+    rows = [synthetic_security(index, rng, unknown=rng.random() < unknown_share) for index in range(securities)]
+    end = datetime.utcnow().replace(microsecond=0)
+
+    with engine.begin() as conn:
+        if clear:
+            reset(conn)
+
+        conn.execute(insert(Security), rows)
+        for chunk in _chunks(
+            score for row in rows for score in synthetic_scores(row["symbol"], scores, end, rng)
+        ):
+            conn.execute(insert(Score), chunk)
+
+        user_ids = list(conn.execute(
+            insert(User).returning(User.id),
+            [
+                {"email": f"bench-{index}@example.com", "password_hash": "benchmark", "first_name": "Bench", "last_name": f"User {index}"}
+                for index in range(users)
+            ]
+        ).scalars())
+        watchlist_ids = list(conn.execute(
+            insert(Watchlist).returning(Watchlist.id),
+            [{"user_id": user_id, "name": f"Watchlist {number + 1}"} for user_id in user_ids for number in range(watchlists)]
+        ).scalars()) if user_ids and watchlists else []
+
+        symbols = [row["symbol"] for row in rows]
+        for chunk in _chunks(
+            {"watchlist_id": watchlist_id, "symbol": symbol}
+            for watchlist_id in watchlist_ids
+            for symbol in rng.sample(symbols, min(items, len(symbols)))
+        ):
+            conn.execute(insert(WatchlistItem), chunk)
+
+    logger.info(
+        f"Seeded {len(rows)} securities, {len(rows) * scores} scores, {len(user_ids)} users "
+        f"and {len(watchlist_ids)} watchlists"
+    )
+    return {
+        "symbols": [row["symbol"] for row in rows if row["is_active"] and not row["symbol"].startswith(UNKNOWN_SYMBOL_PREFIX)],
+        "unknown_symbols": [row["symbol"] for row in rows if row["symbol"].startswith(UNKNOWN_SYMBOL_PREFIX)],
+        "user_ids": user_ids,
+    }
+
+def _main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Seed synthetic benchmark data")
+    parser.add_argument("--securities", type=int, default=2000)
+    parser.add_argument("--scores", type=int, default=30, help="Scores per security")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--watchlists", type=int, default=3, help="Watchlists per user")
+    parser.add_argument("--items", type=int, default=20, help="Securities per watchlist")
+    parser.add_argument("--unknown-share", type=float, default=0.01, help="Share of symbols no provider knows")
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Delete previously seeded benchmark rows first")
+    parser.add_argument("--manifest", default="bench-data.json", help="Where to write the symbols and user ids for the load generator")
+    args = parser.parse_args(argv)
+
+    manifest = seed(
+        args.securities, args.scores, args.users, args.watchlists, args.items,
+        args.unknown_share, args.random_seed, args.reset
+    )
+    with open(args.manifest, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle)
+    print(f"Manifest written to {args.manifest}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    _main()
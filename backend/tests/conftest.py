@@ -0,0 +1,31 @@
+"""
+Test Fixtures
+Market data services with stubbed providers, separate from the module-level instance
+"""
+
+import asyncio
+from typing import Iterable
+
+import pytest_asyncio
+
+from app.services.market_data import MarketDataService, MarketQuote
+
+def price_quote(symbol: str, price: float, source: str, change_percent: float = 1.0) -> MarketQuote:
+    return MarketQuote(symbol=symbol, price=price, change_percent=change_percent, source=source)
+
+def configure(service: MarketDataService, providers: Iterable[str]):
+    """Treat only the given providers as having credentials"""
+    configured = set(providers)
+    service._provider_configured = lambda provider: provider in configured
+
+@pytest_asyncio.fixture
+async def service():
+    market_service = MarketDataService()
+    configure(market_service, ())
+    yield market_service
+    # Let abandoned provider calls (hedge losers) unwind before the loop closes
+    leftover = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in leftover:
+        task.cancel()
+    await asyncio.gather(*leftover, return_exceptions=True)
+    await market_service.close()
@@ -0,0 +1,97 @@
+"""
+Circuit Breaker Tests
+State transitions and half-open probe handling
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.rate_limit import ProviderLimiter, RateLimitExceeded
+
+def failing_breaker(**kwargs) -> CircuitBreaker:
+    """Breaker opened by a run of failed calls"""
+    breaker = CircuitBreaker("Test", min_calls=3, **kwargs)
+    for _ in range(3):
+        breaker.record(0.01, ok=False)
+    return breaker
+
+def test_opens_at_error_rate():
+    breaker = CircuitBreaker("Test", min_calls=3)
+    breaker.record(0.01, ok=False)
+    breaker.record(0.01, ok=False)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record(0.01, ok=True)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+def test_opens_on_slow_calls():
+    breaker = CircuitBreaker("Test", min_calls=3, slow_call_seconds=1.0)
+    for _ in range(3):
+        breaker.record(2.0, ok=True)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_half_open_allows_single_probe():
+    breaker = failing_breaker(open_seconds=0)
+
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()
+
+def test_successful_probe_closes():
+    breaker = failing_breaker(open_seconds=0)
+    assert breaker.allow_request()
+    breaker.record(0.01, ok=True)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.snapshot()["calls"] == 0
+    assert breaker.allow_request()
+
+def test_failed_probe_reopens():
+    breaker = failing_breaker(open_seconds=0)
+    assert breaker.allow_request()
+    breaker.record(0.01, ok=False)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_released_probe_can_be_retried():
+    breaker = failing_breaker(open_seconds=0)
+    assert breaker.allow_request()
+    breaker.release_probe()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+
+@pytest.mark.asyncio
+async def test_rate_limited_call_releases_probe(service):
+    service.breakers["finnhub"] = failing_breaker(open_seconds=0)
+    service.limiters["finnhub"] = ProviderLimiter("Finnhub", 60, max_concurrency=5, max_wait=0.01)
+    service.limiters["finnhub"].bucket.tokens = -5
+    assert service.breakers["finnhub"].allow_request()
+
+    with pytest.raises(RateLimitExceeded):
+        async with service._provider_slot("finnhub"):
+            pass
+
+    assert service.breakers["finnhub"].allow_request()
+
+@pytest.mark.asyncio
+async def test_cancelled_call_is_not_recorded(service):
+    entered = asyncio.Event()
+
+    async def call():
+        async with service._provider_slot("finnhub"):
+            entered.set()
+            await asyncio.sleep(1)
+
+    task = asyncio.create_task(call())
+    await entered.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert service.breakers["finnhub"].snapshot()["calls"] == 0
+    assert service.latency["finnhub"].count == 0
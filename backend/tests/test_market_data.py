@@ -0,0 +1,119 @@
+"""
+Market Data Service Tests
+Request coalescing, hedging and batch fallback with stubbed providers
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.market_data import PRICE_FIELDS
+from app.services.rate_limit import ProviderLimiter
+from .conftest import configure, price_quote
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch(service):
+    configure(service, ["finnhub"])
+    calls = []
+
+    async def finnhub(symbol):
+        calls.append(symbol)
+        await asyncio.sleep(0.05)
+        return price_quote(symbol, 10.0, "Finnhub")
+
+    service.get_finnhub_quote = finnhub
+    quotes = await asyncio.gather(*(
+        service.get_enriched_quote("AAPL", required_fields=PRICE_FIELDS) for _ in range(5)
+    ))
+
+    assert calls == ["AAPL"]
+    assert [quote.price for quote in quotes] == [10.0] * 5
+
+@pytest.mark.asyncio
+async def test_cached_quote_skips_providers(service):
+    configure(service, ["finnhub"])
+    calls = []
+
+    async def finnhub(symbol):
+        calls.append(symbol)
+        return price_quote(symbol, 10.0, "Finnhub")
+
+    service.get_finnhub_quote = finnhub
+    await service.get_enriched_quote("AAPL", required_fields=PRICE_FIELDS)
+    quote = await service.get_enriched_quote("AAPL", required_fields=PRICE_FIELDS)
+
+    assert calls == ["AAPL"]
+    assert quote.price == 10.0 and not quote.is_stale
+
+@pytest.mark.asyncio
+async def test_queued_primary_is_not_hedged(service):
+    configure(service, ["finnhub", "alpaca"])
+    service.hedge_default_delay = 0.05
+    # The primary waits about 0.3s for a rate token, well past the hedge delay
+    service.limiters["finnhub"] = ProviderLimiter("Finnhub", 600, max_concurrency=10, max_wait=1)
+    service.limiters["finnhub"].bucket.tokens = -2
+    alpaca_calls = []
+
+    async def finnhub(symbol):
+        async with service._provider_slot("finnhub"):
+            return price_quote(symbol, 10.0, "Finnhub")
+
+    async def alpaca(symbol):
+        alpaca_calls.append(symbol)
+        return price_quote(symbol, 11.0, "Alpaca")
+
+    service.get_finnhub_quote = finnhub
+    service.get_alpaca_quote = alpaca
+    quote = await service.get_enriched_quote("AAPL", required_fields=PRICE_FIELDS)
+
+    assert alpaca_calls == []
+    assert quote.price == 10.0 and quote.source == "Finnhub"
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged(service):
+    configure(service, ["finnhub", "alpaca"])
+    service.hedge_default_delay = 0.05
+    alpaca_calls = []
+
+    async def finnhub(symbol):
+        async with service._provider_slot("finnhub"):
+            await asyncio.sleep(0.5)
+            return price_quote(symbol, 10.0, "Finnhub")
+
+    async def alpaca(symbol):
+        alpaca_calls.append(symbol)
+        return price_quote(symbol, 11.0, "Alpaca", change_percent=2.0)
+
+    service.get_finnhub_quote = finnhub
+    service.get_alpaca_quote = alpaca
+    quote = await service.get_enriched_quote("AAPL", required_fields=PRICE_FIELDS)
+
+    assert alpaca_calls == ["AAPL"]
+    assert quote.price == 11.0 and quote.source == "Alpaca"
+
+@pytest.mark.asyncio
+async def test_joined_batch_falls_back_per_symbol(service):
+    configure(service, ["finnhub", "alpaca"])
+
+    async def snapshots(symbols):
+        await asyncio.sleep(0.05)
+        return {"A": price_quote("A", 10.0, "Alpaca")}
+
+    async def finnhub(symbol):
+        return price_quote(symbol, 20.0, "Finnhub")
+
+    async def alpaca(symbol):
+        return None
+
+    service.get_alpaca_snapshots = snapshots
+    service.get_finnhub_quote = finnhub
+    service.get_alpaca_quote = alpaca
+    batch = service._start_price_batch(["A", "B"])
+    quote_a, quote_b = await asyncio.gather(
+        service.get_enriched_quote("A", required_fields=PRICE_FIELDS),
+        service.get_enriched_quote("B", required_fields=PRICE_FIELDS),
+    )
+    await batch
+
+    assert quote_a.price == 10.0 and quote_a.source == "Alpaca"
+    assert quote_b.price == 20.0 and quote_b.source == "Finnhub"
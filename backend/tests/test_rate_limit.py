@@ -0,0 +1,90 @@
+"""
+Rate Limit Tests
+Token buckets and the AIMD concurrency limiter
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.rate_limit import (
+    AdaptiveConcurrencyLimiter, ProviderLimiter, RateLimitExceeded, TokenBucket
+)
+
+def test_low_rate_bucket_keeps_minimum_burst():
+    assert TokenBucket(5).capacity == 3
+    assert TokenBucket(600).capacity == 100
+
+@pytest.mark.asyncio
+async def test_slow_bucket_waits_one_interval():
+    bucket = TokenBucket(600, burst=1)
+
+    assert await bucket.acquire(0)
+    # Refilling one token takes 0.1s, longer than max_wait but within one interval
+    waiting = asyncio.create_task(bucket.acquire(0))
+    await asyncio.sleep(0)
+    # A second queued token would take two intervals
+    assert not await bucket.acquire(0)
+    assert await waiting
+
+@pytest.mark.asyncio
+async def test_token_returned_when_no_slot_is_granted():
+    limiter = ProviderLimiter("Test", 600, max_concurrency=1, max_wait=0.05)
+    await limiter.concurrency.acquire()
+    tokens = limiter.bucket.tokens
+
+    with pytest.raises(RateLimitExceeded):
+        async with limiter.slot():
+            pass
+
+    assert limiter.bucket.tokens >= tokens
+    assert limiter.concurrency.in_flight == 1
+
+@pytest.mark.asyncio
+async def test_limit_grows_on_healthy_calls():
+    limiter = AdaptiveConcurrencyLimiter(initial=4, max_limit=10)
+    await limiter.acquire()
+    await limiter.release(0.01)
+
+    assert limiter.limit == pytest.approx(4.25)
+    assert limiter.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_limit_halves_on_throttling_and_latency():
+    limiter = AdaptiveConcurrencyLimiter(initial=8, latency_threshold=1.0, cooldown=0)
+
+    await limiter.acquire()
+    await limiter.release(0.01, throttled=True)
+    assert limiter.current_limit == 4
+
+    await limiter.acquire()
+    await limiter.release(2.0)
+    assert limiter.current_limit == 2
+
+@pytest.mark.asyncio
+async def test_unsampled_release_keeps_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial=4, cooldown=0)
+    await limiter.acquire()
+    await limiter.release(10.0, throttled=True, sample=False)
+
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_cancelled_call_keeps_limit():
+    limiter = ProviderLimiter("Test", 600, max_concurrency=10, latency_threshold=0.01)
+    entered = asyncio.Event()
+
+    async def call():
+        async with limiter.slot():
+            entered.set()
+            await asyncio.sleep(1)
+
+    task = asyncio.create_task(call())
+    await entered.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert limiter.concurrency.limit == 5
+    assert limiter.concurrency.in_flight == 0